@@ -0,0 +1,53 @@
+"""
+Bounded LRU cache keyed by OCP shapes.
+
+Used to memoize conversions and topology extraction of repeated shapes.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from OCP.TopoDS import TopoDS_Shape
+
+
+class ShapeCache:
+    """
+    Least recently used cache of values keyed by a shape plus extra options.
+
+    Shapes are keyed by hash() (TShape and location) and orientation, and hash
+    collisions are ruled out by checking the stored shape with IsEqual.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # (hash, orientation, *options) -> (shape, value), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[TopoDS_Shape, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(shape: TopoDS_Shape, options: Tuple) -> Tuple:
+        """Cache key of a shape; hash() ignores orientation, so it is added explicitly."""
+        return (hash(shape), shape.Orientation(), *options)
+
+    def get(self, shape: TopoDS_Shape, options: Tuple = ()) -> Optional[Any]:
+        """Return the value cached for `shape` and `options`, or None on a miss."""
+        key = self._key(shape, options)
+        entry = self._entries.get(key)
+        if entry is None or not entry[0].IsEqual(shape):
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, shape: TopoDS_Shape, options: Tuple, value: Any) -> None:
+        """Cache `value` for `shape` and `options`, evicting the least recently used entries."""
+        key = self._key(shape, options)
+        self._entries[key] = (shape, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
@@ -5,25 +5,54 @@ This module provides the main API for converting CadQuery shapes to
 PyTorch Geometric heterogeneous graphs.
 """
 
-from typing import List, Tuple, Union
+import copy
+from typing import Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import torch
 from torch_geometric.data import HeteroData
 
 import cadquery as cq
 from OCP.TopoDS import TopoDS_Shape
 
-from .topology import extract_topology, TopologyData
+from .cache import ShapeCache
+from .topology import extract_topology, clear_topology_cache, TopologyData
 from .geometry import (
     extract_vertex_geometry, extract_edge_geometry, extract_face_geometry,
-    VertexGeometry, EdgeGeometry, FaceGeometry, ControlPoint
+    extract_geometry_parallel, VertexGeometry, EdgeGeometry, FaceGeometry
 )
 from .features import (
     build_vertex_features, build_edge_features, build_face_features,
-    build_control_point_features, build_edge_index
+    build_control_point_features, build_edge_indices, build_ragged
 )
 
 
+# Maximum number of converted graphs kept when conversion caching is enabled
+CACHE_SIZE = 128
+
+# Graphs memoized by `cache=True` conversions; hits are returned as shallow copies
+_conversion_cache = ShapeCache(CACHE_SIZE)
+
+
+def clear_conversion_cache() -> None:
+    """Drop all graphs and topologies memoized by `cache=True` conversions."""
+    _conversion_cache.clear()
+    clear_topology_cache()
+
+
+# Node feature dtypes accepted by the converters' feature_dtype option
+FEATURE_DTYPES = (torch.float32, torch.float16, torch.bfloat16)
+
+
+def _cast_node_features(data: HeteroData, feature_dtype: torch.dtype) -> None:
+    """Cast the `x` tensor of every node type to `feature_dtype` in place."""
+    if feature_dtype not in FEATURE_DTYPES:
+        raise ValueError(f"feature_dtype must be one of {FEATURE_DTYPES}, got {feature_dtype}")
+    if feature_dtype != torch.float32:
+        for store in data.node_stores:
+            store.x = store.x.to(feature_dtype)
+
+
 def _get_occ_shape(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> TopoDS_Shape:
     """Extract TopoDS_Shape from various CadQuery input types."""
     if isinstance(shape, cq.Workplane):
@@ -36,7 +65,60 @@ def _get_occ_shape(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> TopoDS
         raise TypeError(f"Expected CadQuery Workplane, Shape, or TopoDS_Shape, got {type(shape)}")
 
 
-def cadquery_to_pyg_simple(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> HeteroData:
+def _extract_geometries(
+    shape: TopoDS_Shape, topo: TopologyData, processes: Optional[int]
+) -> Tuple[Iterator[VertexGeometry], List[EdgeGeometry], List[FaceGeometry]]:
+    """
+    Extract geometry for every vertex, edge and face of the topology.
+
+    Vertex geometry is returned as a lazy iterator: build_vertex_features consumes it
+    in a single pass, so the per-vertex objects are never held all at once.
+    """
+    vertex_geoms = map(extract_vertex_geometry, topo.vertices)
+    if processes == 1:
+        edge_geoms = [extract_edge_geometry(e) for e in topo.edges]
+        face_geoms = [extract_face_geometry(f) for f in topo.faces]
+    else:
+        edge_geoms, face_geoms = extract_geometry_parallel(shape, topo, processes)
+    return vertex_geoms, edge_geoms, face_geoms
+
+
+def _collect_control_points(
+    geometries: List[Union[EdgeGeometry, FaceGeometry]], start: int, index_dim: int
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Gather the control point arrays of edge or face geometries.
+
+    Control points are numbered consecutively from `start` in geometry order.
+
+    Returns:
+        (list of [n, 4] control point arrays,
+         [N, 2] array of (cp_idx, geometry_idx) pairs,
+         [N, index_dim] array of control point grid indices)
+    """
+    owners = [i for i, geom in enumerate(geometries) if geom.control_points is not None]
+    if not owners:
+        return [], np.empty((0, 2), dtype=np.int64), np.empty((0, index_dim), dtype=np.int64)
+
+    chunks = [geometries[i].control_points for i in owners]
+    sizes = [len(chunk) for chunk in chunks]
+    total = sum(sizes)
+    pairs = np.stack([
+        np.arange(start, start + total, dtype=np.int64),
+        np.repeat(np.asarray(owners, dtype=np.int64), sizes),
+    ], axis=1)
+    indices = np.concatenate([geometries[i].control_point_indices for i in owners])
+    return chunks, pairs, indices
+
+
+def cadquery_to_pyg_simple(
+    shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape],
+    processes: Optional[int] = 1,
+    pin_memory: bool = False,
+    cache: bool = False,
+    index_dtype: torch.dtype = torch.long,
+    feature_dtype: torch.dtype = torch.float32,
+) -> HeteroData:
     """
     Convert a CadQuery shape to a simple PyG heterogeneous graph.
 
@@ -55,19 +137,40 @@ def cadquery_to_pyg_simple(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -
 
     Args:
         shape: A CadQuery Workplane, Shape, or raw TopoDS_Shape
+        processes: Worker processes for edge/face geometry extraction. 1 (default)
+            extracts in-process; None uses os.cpu_count(). Small shapes are always
+            extracted in-process.
+        pin_memory: Place all tensors in page-locked memory, so that
+            `data.to('cuda', non_blocking=True)` copies asynchronously. Requires CUDA.
+        cache: Memoize the result, keyed by the underlying TopoDS_Shape (TShape,
+            location and orientation). Converting the same shape again returns a
+            shallow copy of the cached graph: attributes can be reassigned freely,
+            but the tensors are shared, so modify them out-of-place only. The
+            shape's topology is cached as well, so converting it with other
+            options (or the other converter) skips topology extraction.
+        index_dtype: dtype of every edge_index tensor, torch.long (default) or
+            torch.int32. int32 halves index memory but is not accepted by every
+            PyG operator.
+        feature_dtype: dtype of every node feature tensor `x`: torch.float32
+            (default), torch.float16 or torch.bfloat16. One-hot columns, flags and
+            degrees stay exact in half precision, but coordinates, parameter bounds
+            and radii are rounded (to ~3 significant digits for bfloat16).
 
     Returns:
         HeteroData graph containing topology and geometry (no B-spline data)
     """
     occ_shape = _get_occ_shape(shape)
+    options = ('simple', pin_memory, index_dtype, feature_dtype)
+    if cache:
+        cached = _conversion_cache.get(occ_shape, options)
+        if cached is not None:
+            return copy.copy(cached)
 
     # Extract topology
-    topo = extract_topology(occ_shape)
+    topo = extract_topology(occ_shape, cache=cache)
 
     # Extract geometry for each entity
-    vertex_geoms = [extract_vertex_geometry(v) for v in topo.vertices]
-    edge_geoms = [extract_edge_geometry(e) for e in topo.edges]
-    face_geoms = [extract_face_geometry(f) for f in topo.faces]
+    vertex_geoms, edge_geoms, face_geoms = _extract_geometries(occ_shape, topo, processes)
 
     # Build HeteroData
     data = HeteroData()
@@ -77,15 +180,35 @@ def cadquery_to_pyg_simple(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -
     data['edge'].x = build_edge_features(edge_geoms)
     data['face'].x = build_face_features(face_geoms)
 
-    # Topology edge indices
-    data['vertex', 'bounds', 'edge'].edge_index = build_edge_index(topo.vertex_to_edge)
-    data['edge', 'bounds', 'face'].edge_index = build_edge_index(topo.edge_to_face)
-    data['face', 'adjacent', 'face'].edge_index = build_edge_index(topo.face_to_face)
+    # Topology edge indices; the relationships are [2, N], so their transposes
+    # are [N, 2] pair views
+    v2e, e2f, f2f = build_edge_indices(
+        [topo.vertex_to_edge.T, topo.edge_to_face.T, topo.face_to_face.T], index_dtype,
+        undirected=(2,) if topo.undirected else (),
+    )
+    data['vertex', 'bounds', 'edge'].edge_index = v2e
+    data['edge', 'bounds', 'face'].edge_index = e2f
+    data['face', 'adjacent', 'face'].edge_index = f2f
+
+    _cast_node_features(data, feature_dtype)
 
+    if pin_memory:
+        data = data.pin_memory()
+
+    if cache:
+        _conversion_cache.put(occ_shape, options, data)
+        return copy.copy(data)
     return data
 
 
-def cadquery_to_pyg(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> HeteroData:
+def cadquery_to_pyg(
+    shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape],
+    processes: Optional[int] = 1,
+    pin_memory: bool = False,
+    cache: bool = False,
+    index_dtype: torch.dtype = torch.long,
+    feature_dtype: torch.dtype = torch.float32,
+) -> HeteroData:
     """
     Convert a CadQuery shape to a PyG heterogeneous graph.
 
@@ -106,44 +229,46 @@ def cadquery_to_pyg(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> Heter
 
     Args:
         shape: A CadQuery Workplane, Shape, or raw TopoDS_Shape
+        processes: Worker processes for edge/face geometry extraction. 1 (default)
+            extracts in-process; None uses os.cpu_count(). Small shapes are always
+            extracted in-process.
+        pin_memory: Place all tensors in page-locked memory, so that
+            `data.to('cuda', non_blocking=True)` copies asynchronously. Requires CUDA.
+        cache: Memoize the result, keyed by the underlying TopoDS_Shape (TShape,
+            location and orientation). Converting the same shape again returns a
+            shallow copy of the cached graph: attributes can be reassigned freely,
+            but the tensors are shared, so modify them out-of-place only. The
+            shape's topology is cached as well, so converting it with other
+            options (or the other converter) skips topology extraction.
+        index_dtype: dtype of every edge_index tensor, torch.long (default) or
+            torch.int32. int32 halves index memory but is not accepted by every
+            PyG operator.
+        feature_dtype: dtype of every node feature tensor `x`: torch.float32
+            (default), torch.float16 or torch.bfloat16. One-hot columns, flags and
+            degrees stay exact in half precision, but coordinates, parameter bounds
+            and radii are rounded (to ~3 significant digits for bfloat16).
 
     Returns:
         HeteroData graph containing all topology and geometry information
     """
     occ_shape = _get_occ_shape(shape)
+    options = ('full', pin_memory, index_dtype, feature_dtype)
+    if cache:
+        cached = _conversion_cache.get(occ_shape, options)
+        if cached is not None:
+            return copy.copy(cached)
 
     # Extract topology
-    topo = extract_topology(occ_shape)
+    topo = extract_topology(occ_shape, cache=cache)
 
     # Extract geometry for each entity
-    vertex_geoms = [extract_vertex_geometry(v) for v in topo.vertices]
-    edge_geoms = [extract_edge_geometry(e) for e in topo.edges]
-    face_geoms = [extract_face_geometry(f) for f in topo.faces]
-
-    # Collect all control points and build their relationships
-    control_points: List[ControlPoint] = []
-    cp_to_edge: List[Tuple[int, int]] = []  # (cp_idx, edge_idx)
-    cp_to_edge_attr: List[Tuple[int]] = []  # (sequence_index,)
-    cp_to_face: List[Tuple[int, int]] = []  # (cp_idx, face_idx)
-    cp_to_face_attr: List[Tuple[int, int]] = []  # (u_index, v_index)
-
-    # Control points from edges
-    for edge_idx, geom in enumerate(edge_geoms):
-        if geom.control_points:
-            for cp in geom.control_points:
-                cp_idx = len(control_points)
-                control_points.append(cp)
-                cp_to_edge.append((cp_idx, edge_idx))
-                cp_to_edge_attr.append(cp.index)
-
-    # Control points from faces
-    for face_idx, geom in enumerate(face_geoms):
-        if geom.control_points:
-            for cp in geom.control_points:
-                cp_idx = len(control_points)
-                control_points.append(cp)
-                cp_to_face.append((cp_idx, face_idx))
-                cp_to_face_attr.append(cp.index)
+    vertex_geoms, edge_geoms, face_geoms = _extract_geometries(occ_shape, topo, processes)
+
+    # Collect control points (edges first, then faces) and build their relationships
+    edge_cps, cp_to_edge, cp_to_edge_attr = _collect_control_points(edge_geoms, 0, 1)
+    face_cps, cp_to_face, cp_to_face_attr = _collect_control_points(
+        face_geoms, len(cp_to_edge), 2
+    )
 
     # Build HeteroData
     data = HeteroData()
@@ -152,55 +277,52 @@ def cadquery_to_pyg(shape: Union[cq.Workplane, cq.Shape, TopoDS_Shape]) -> Heter
     data['vertex'].x = build_vertex_features(vertex_geoms)
     data['edge'].x = build_edge_features(edge_geoms)
     data['face'].x = build_face_features(face_geoms)
-    data['control_point'].x = build_control_point_features(control_points)
-
-    # Store knot vectors as auxiliary data (variable length, stored as lists)
-    edge_knots = []
-    edge_multiplicities = []
-    for geom in edge_geoms:
-        edge_knots.append(geom.knots if geom.knots else [])
-        edge_multiplicities.append(geom.multiplicities if geom.multiplicities else [])
-    data['edge'].knots = edge_knots
-    data['edge'].multiplicities = edge_multiplicities
-
-    face_u_knots = []
-    face_v_knots = []
-    face_u_multiplicities = []
-    face_v_multiplicities = []
-    for geom in face_geoms:
-        face_u_knots.append(geom.u_knots if geom.u_knots else [])
-        face_v_knots.append(geom.v_knots if geom.v_knots else [])
-        face_u_multiplicities.append(geom.u_multiplicities if geom.u_multiplicities else [])
-        face_v_multiplicities.append(geom.v_multiplicities if geom.v_multiplicities else [])
-    data['face'].u_knots = face_u_knots
-    data['face'].v_knots = face_v_knots
-    data['face'].u_multiplicities = face_u_multiplicities
-    data['face'].v_multiplicities = face_v_multiplicities
-
-    # Topology edge indices
-    data['vertex', 'bounds', 'edge'].edge_index = build_edge_index(topo.vertex_to_edge)
-    data['edge', 'bounds', 'face'].edge_index = build_edge_index(topo.edge_to_face)
-    data['face', 'adjacent', 'face'].edge_index = build_edge_index(topo.face_to_face)
-
-    # Control point edge indices
-    data['control_point', 'controls', 'edge'].edge_index = build_edge_index(cp_to_edge)
-    data['control_point', 'controls', 'face'].edge_index = build_edge_index(cp_to_face)
-
-    # Control point edge attributes (indices for ordering)
-    if cp_to_edge_attr:
-        # For curves: single sequence index
-        data['control_point', 'controls', 'edge'].edge_attr = torch.tensor(
-            [idx[0] for idx in cp_to_edge_attr], dtype=torch.long
-        ).unsqueeze(1)
-    else:
-        data['control_point', 'controls', 'edge'].edge_attr = torch.empty((0, 1), dtype=torch.long)
-
-    if cp_to_face_attr:
-        # For surfaces: (u_index, v_index)
-        data['control_point', 'controls', 'face'].edge_attr = torch.tensor(
-            cp_to_face_attr, dtype=torch.long
-        )
-    else:
-        data['control_point', 'controls', 'face'].edge_attr = torch.empty((0, 2), dtype=torch.long)
-
+    data['control_point'].x = build_control_point_features(edge_cps + face_cps)
+
+    # Knot vectors (variable length) as flat values plus per-node counts, which PyG
+    # batching concatenates correctly; multiplicities share the knot counts.
+    # Knots stay float64 so the parameterization is kept exactly
+    data['edge'].knots, data['edge'].knots_counts = build_ragged(
+        [g.knots for g in edge_geoms], torch.float64
+    )
+    data['edge'].multiplicities, _ = build_ragged(
+        [g.multiplicities for g in edge_geoms], torch.long
+    )
+    data['face'].u_knots, data['face'].u_knots_counts = build_ragged(
+        [g.u_knots for g in face_geoms], torch.float64
+    )
+    data['face'].u_multiplicities, _ = build_ragged(
+        [g.u_multiplicities for g in face_geoms], torch.long
+    )
+    data['face'].v_knots, data['face'].v_knots_counts = build_ragged(
+        [g.v_knots for g in face_geoms], torch.float64
+    )
+    data['face'].v_multiplicities, _ = build_ragged(
+        [g.v_multiplicities for g in face_geoms], torch.long
+    )
+
+    # Topology and control point edge indices, sharing one allocation; the topology
+    # relationships are [2, N], so their transposes are [N, 2] pair views
+    v2e, e2f, f2f, cp2e, cp2f = build_edge_indices([
+        topo.vertex_to_edge.T, topo.edge_to_face.T, topo.face_to_face.T, cp_to_edge, cp_to_face
+    ], index_dtype, undirected=(2,) if topo.undirected else ())
+    data['vertex', 'bounds', 'edge'].edge_index = v2e
+    data['edge', 'bounds', 'face'].edge_index = e2f
+    data['face', 'adjacent', 'face'].edge_index = f2f
+    data['control_point', 'controls', 'edge'].edge_index = cp2e
+    data['control_point', 'controls', 'face'].edge_index = cp2f
+
+    # Control point edge attributes (indices for ordering):
+    # sequence index for curves, (u_index, v_index) for surfaces
+    data['control_point', 'controls', 'edge'].edge_attr = torch.from_numpy(cp_to_edge_attr)
+    data['control_point', 'controls', 'face'].edge_attr = torch.from_numpy(cp_to_face_attr)
+
+    _cast_node_features(data, feature_dtype)
+
+    if pin_memory:
+        data = data.pin_memory()
+
+    if cache:
+        _conversion_cache.put(occ_shape, options, data)
+        return copy.copy(data)
     return data
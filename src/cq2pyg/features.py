@@ -4,11 +4,18 @@ Feature tensor building for PyG HeteroData.
 Converts geometry data into fixed-size tensors for each node type.
 """
 
-from typing import List, Tuple
+from itertools import chain, compress
+from typing import Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 import torch
 
-from .geometry import VertexGeometry, EdgeGeometry, FaceGeometry, ControlPoint
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, see the "fast" extra
+    njit = None
+
+from .geometry import VertexGeometry, EdgeGeometry, FaceGeometry
 from .types import (
     CurveType, SurfaceType,
     NUM_CURVE_TYPES, NUM_SURFACE_TYPES,
@@ -16,25 +23,140 @@ from .types import (
 )
 
 
-def build_vertex_features(geometries: List[VertexGeometry]) -> torch.Tensor:
+_ZERO_VECTOR = (0.0, 0.0, 0.0)
+
+# Row count from which edge/face packing uses the numba kernel when numba is installed;
+# smaller inputs are not worth the one-off JIT compile
+NUMBA_MIN_ROWS = 4096
+
+
+def _vector_column(values: List[Optional[Tuple[float, float, float]]]) -> np.ndarray:
+    """Stack optional 3-vectors into an [N, 3] array, using zeros for missing values."""
+    return np.array([_ZERO_VECTOR if v is None else v for v in values], dtype=np.float32).reshape(-1, 3)
+
+
+def _scalar_column(values: List[Optional[float]]) -> np.ndarray:
+    """Stack optional scalars into an [N, 1] array, using zero for missing values."""
+    return np.array([0.0 if v is None else v for v in values], dtype=np.float32).reshape(-1, 1)
+
+
+def _pack_features_np(types: np.ndarray, blocks: Tuple[np.ndarray, ...], start: int, out: np.ndarray) -> None:
+    """
+    Write a type one-hot followed by dense column blocks into `out`.
+
+    The one-hot occupies the first columns of `out`; `blocks` are [N, k] arrays
+    written consecutively from column `start` on.
+    """
+    out[np.arange(len(types)), types] = 1.0
+    col = start
+    for block in blocks:
+        out[:, col:col + block.shape[1]] = block
+        col += block.shape[1]
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _pack_features_nb(types, blocks, start, out):
+        """Compiled row-parallel equivalent of _pack_features_np."""
+        for i in prange(types.shape[0]):
+            out[i, types[i]] = 1.0
+            col = start
+            for block in blocks:
+                for j in range(block.shape[1]):
+                    out[i, col + j] = block[i, j]
+                col += block.shape[1]
+
+
+def _pack_features(types: np.ndarray, blocks: Tuple[np.ndarray, ...], dim: int, start: int) -> np.ndarray:
+    """Allocate an [N, dim] float32 feature array and pack `types` and `blocks` into it."""
+    out = np.zeros((len(types), dim), dtype=np.float32)
+    if njit is not None and len(types) >= NUMBA_MIN_ROWS:
+        _pack_features_nb(types, blocks, start, out)
+    else:
+        _pack_features_np(types, blocks, start, out)
+    return out
+
+
+_CONIC_CURVES = (CurveType.CIRCLE, CurveType.ELLIPSE)
+_AXIAL_SURFACES = (SurfaceType.CYLINDER, SurfaceType.CONE, SurfaceType.SPHERE, SurfaceType.TORUS)
+
+# Edge feature columns that only some curve types populate: (types, attribute, column, width)
+_EDGE_TYPED_COLUMNS = (
+    ((CurveType.LINE,), 'line_direction', NUM_CURVE_TYPES + 5, 3),
+    (_CONIC_CURVES, 'center', NUM_CURVE_TYPES + 8, 3),
+    (_CONIC_CURVES, 'axis', NUM_CURVE_TYPES + 11, 3),
+    (_CONIC_CURVES, 'radius', NUM_CURVE_TYPES + 14, 1),
+)
+
+# Face feature columns that only some surface types populate: (types, attribute, column, width)
+_FACE_TYPED_COLUMNS = (
+    ((SurfaceType.PLANE,), 'plane_normal', NUM_SURFACE_TYPES + 9, 3),
+    ((SurfaceType.PLANE,), 'plane_origin', NUM_SURFACE_TYPES + 12, 3),
+    (_AXIAL_SURFACES, 'axis_direction', NUM_SURFACE_TYPES + 15, 3),
+    (_AXIAL_SURFACES, 'axis_origin', NUM_SURFACE_TYPES + 18, 3),
+    (_AXIAL_SURFACES, 'radius', NUM_SURFACE_TYPES + 21, 1),
+    ((SurfaceType.TORUS,), 'radius2', NUM_SURFACE_TYPES + 22, 1),
+)
+
+
+def _fill_typed_columns(
+    out: np.ndarray,
+    types: np.ndarray,
+    geometries: List[Union[EdgeGeometry, FaceGeometry]],
+    columns: Tuple[Tuple[Tuple[int, ...], str, int, int], ...],
+) -> None:
+    """
+    Write type-specific fields into `out`, touching only the rows that carry them.
+
+    Each entry of `columns` is (owning types, attribute, first column, width). The attribute
+    is gathered only from geometries whose type is one of the owning types, so a field
+    costs nothing when no row of that type is present. Fields of other rows stay zero.
+    """
+    for owners, attr, col, width in columns:
+        mask = np.isin(types, owners)
+        if not mask.any():
+            continue
+        values = [getattr(g, attr) for g in compress(geometries, mask)]
+        column = _vector_column if width == 3 else _scalar_column
+        out[mask, col:col + width] = column(values)
+
+
+def _edge_scalar_block(geometries: List[EdgeGeometry]) -> np.ndarray:
+    """Orientation, degree, is_closed and parameter bounds as an [N, 5] block."""
+    return np.array(
+        [(g.orientation, g.degree, g.is_closed, g.t_min, g.t_max) for g in geometries],
+        dtype=np.float32,
+    ).reshape(-1, 5)
+
+
+def _face_scalar_block(geometries: List[FaceGeometry]) -> np.ndarray:
+    """Orientation, degrees, closed flags and parameter bounds as an [N, 9] block."""
+    return np.array(
+        [
+            (g.orientation, g.u_degree, g.v_degree, g.is_u_closed, g.is_v_closed,
+             g.u_min, g.u_max, g.v_min, g.v_max)
+            for g in geometries
+        ],
+        dtype=np.float32,
+    ).reshape(-1, 9)
+
+
+def build_vertex_features(geometries: Iterable[VertexGeometry]) -> torch.Tensor:
     """
     Build vertex feature tensor.
 
     Args:
-        geometries: List of VertexGeometry objects
+        geometries: VertexGeometry objects; consumed in a single pass, so a lazy
+            iterator works as well as a list
 
     Returns:
         Tensor of shape [num_vertices, 3] containing (x, y, z) coordinates
     """
-    if not geometries:
-        return torch.empty((0, VERTEX_FEATURE_DIM), dtype=torch.float32)
-
-    features = torch.zeros((len(geometries), VERTEX_FEATURE_DIM), dtype=torch.float32)
-    for i, geom in enumerate(geometries):
-        features[i, 0] = geom.x
-        features[i, 1] = geom.y
-        features[i, 2] = geom.z
-    return features
+    features = np.fromiter(
+        chain.from_iterable((g.x, g.y, g.z) for g in geometries),
+        dtype=np.float32,
+    ).reshape(-1, VERTEX_FEATURE_DIM)
+    return torch.from_numpy(features)
 
 
 def build_edge_features(geometries: List[EdgeGeometry]) -> torch.Tensor:
@@ -58,54 +180,12 @@ def build_edge_features(geometries: List[EdgeGeometry]) -> torch.Tensor:
     Returns:
         Tensor of shape [num_edges, EDGE_FEATURE_DIM]
     """
-    if not geometries:
-        return torch.empty((0, EDGE_FEATURE_DIM), dtype=torch.float32)
-
-    features = torch.zeros((len(geometries), EDGE_FEATURE_DIM), dtype=torch.float32)
-    offset = 0
-
-    for i, geom in enumerate(geometries):
-        # Curve type one-hot
-        features[i, geom.curve_type] = 1.0
-        offset = NUM_CURVE_TYPES
-
-        # Orientation
-        features[i, offset] = geom.orientation
-        offset += 1
-
-        # Degree
-        features[i, offset] = geom.degree
-        offset += 1
-
-        # Is closed
-        features[i, offset] = 1.0 if geom.is_closed else 0.0
-        offset += 1
-
-        # Parameter bounds
-        features[i, offset] = geom.t_min
-        features[i, offset + 1] = geom.t_max
-        offset += 2
-
-        # Line direction
-        if geom.line_direction is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.line_direction)
-        offset += 3
-
-        # Center
-        if geom.center is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.center)
-        offset += 3
-
-        # Axis
-        if geom.axis is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.axis)
-        offset += 3
-
-        # Radius
-        if geom.radius is not None:
-            features[i, offset] = geom.radius
-
-    return features
+    curve_types = np.array([g.curve_type for g in geometries], dtype=np.int64)
+    out = _pack_features(
+        curve_types, (_edge_scalar_block(geometries),), EDGE_FEATURE_DIM, NUM_CURVE_TYPES
+    )
+    _fill_typed_columns(out, curve_types, geometries, _EDGE_TYPED_COLUMNS)
+    return torch.from_numpy(out)
 
 
 def build_face_features(geometries: List[FaceGeometry]) -> torch.Tensor:
@@ -130,101 +210,134 @@ def build_face_features(geometries: List[FaceGeometry]) -> torch.Tensor:
     Returns:
         Tensor of shape [num_faces, FACE_FEATURE_DIM]
     """
-    if not geometries:
-        return torch.empty((0, FACE_FEATURE_DIM), dtype=torch.float32)
-
-    features = torch.zeros((len(geometries), FACE_FEATURE_DIM), dtype=torch.float32)
-
-    for i, geom in enumerate(geometries):
-        offset = 0
-
-        # Surface type one-hot
-        features[i, geom.surface_type] = 1.0
-        offset = NUM_SURFACE_TYPES
-
-        # Orientation
-        features[i, offset] = geom.orientation
-        offset += 1
-
-        # Degrees
-        features[i, offset] = geom.u_degree
-        features[i, offset + 1] = geom.v_degree
-        offset += 2
+    surface_types = np.array([g.surface_type for g in geometries], dtype=np.int64)
+    out = _pack_features(
+        surface_types, (_face_scalar_block(geometries),), FACE_FEATURE_DIM, NUM_SURFACE_TYPES
+    )
+    _fill_typed_columns(out, surface_types, geometries, _FACE_TYPED_COLUMNS)
+    return torch.from_numpy(out)
 
-        # Closed flags
-        features[i, offset] = 1.0 if geom.is_u_closed else 0.0
-        features[i, offset + 1] = 1.0 if geom.is_v_closed else 0.0
-        offset += 2
 
-        # Parameter bounds
-        features[i, offset] = geom.u_min
-        features[i, offset + 1] = geom.u_max
-        features[i, offset + 2] = geom.v_min
-        features[i, offset + 3] = geom.v_max
-        offset += 4
+def build_control_point_features(control_points: List[np.ndarray]) -> torch.Tensor:
+    """
+    Build control point feature tensor.
 
-        # Plane normal
-        if geom.plane_normal is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.plane_normal)
-        offset += 3
+    Args:
+        control_points: Per-curve/surface arrays of shape [n, 4] (x, y, z, weight)
 
-        # Plane origin
-        if geom.plane_origin is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.plane_origin)
-        offset += 3
+    Returns:
+        Tensor of shape [num_control_points, 4] containing (x, y, z, weight)
+    """
+    if not control_points:
+        return torch.from_numpy(np.zeros((0, CONTROL_POINT_FEATURE_DIM), dtype=np.float32))
 
-        # Axis direction
-        if geom.axis_direction is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.axis_direction)
-        offset += 3
+    return torch.from_numpy(np.concatenate(control_points, dtype=np.float32))
 
-        # Axis origin
-        if geom.axis_origin is not None:
-            features[i, offset:offset + 3] = torch.tensor(geom.axis_origin)
-        offset += 3
 
-        # Radii
-        if geom.radius is not None:
-            features[i, offset] = geom.radius
-        if geom.radius2 is not None:
-            features[i, offset + 1] = geom.radius2
+def build_ragged(
+    sequences: List[Optional[np.ndarray]], dtype: torch.dtype
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Pack variable-length per-node sequences as flat values plus per-node counts.
 
-    return features
+    Counts (rather than [num_nodes + 1] offsets) stay correct when PyG
+    concatenates graphs into a batch; offsets are `counts.cumsum(0)`.
 
+    Args:
+        sequences: One array per node, or None for an empty sequence
+        dtype: dtype of the returned values tensor
 
-def build_control_point_features(control_points: List[ControlPoint]) -> torch.Tensor:
+    Returns:
+        (values, counts): the values of all nodes concatenated in node order, and
+        the [num_nodes] length of each node's sequence
     """
-    Build control point feature tensor.
+    counts = np.fromiter(
+        (0 if seq is None else len(seq) for seq in sequences),
+        dtype=np.int64,
+        count=len(sequences),
+    )
+    present = [seq for seq in sequences if seq is not None]
+    values = np.concatenate(present) if present else np.empty(0)
+    return torch.from_numpy(values).to(dtype), torch.from_numpy(counts)
+
+
+def _index_numpy_dtype(index_dtype: torch.dtype) -> type:
+    """NumPy counterpart of a supported edge_index dtype (torch.long or torch.int32)."""
+    if index_dtype == torch.long:
+        return np.int64
+    if index_dtype == torch.int32:
+        return np.int32
+    raise ValueError(f"index_dtype must be torch.long or torch.int32, got {index_dtype}")
+
+
+def _as_edge_index(pairs: Union[List[Tuple[int, int]], np.ndarray], dtype: type) -> np.ndarray:
+    """View a list of (source, target) pairs or an [N, 2] array as a [2, N] array of `dtype`."""
+    # np.asarray converts a list of int tuples far faster than torch.tensor does
+    pairs = np.asarray(pairs, dtype=dtype)
+    if pairs.size == 0:
+        return np.empty((2, 0), dtype=dtype)
+    if pairs.ndim != 2 or pairs.shape[1] != 2:
+        raise ValueError(f"pairs must be (source, target) pairs of shape [N, 2], got shape {pairs.shape}")
+    return pairs.T
+
+
+def build_edge_index(
+    pairs: Union[List[Tuple[int, int]], np.ndarray], index_dtype: torch.dtype = torch.long
+) -> torch.Tensor:
+    """
+    Build edge_index tensor from list of (source, target) pairs.
 
     Args:
-        control_points: List of ControlPoint objects
+        pairs: List of (source_idx, target_idx) tuples, or an [N, 2] array
+        index_dtype: torch.long (default) or torch.int32
 
     Returns:
-        Tensor of shape [num_control_points, 4] containing (x, y, z, weight)
+        Tensor of shape [2, num_edges] in COO format
     """
-    if not control_points:
-        return torch.empty((0, CONTROL_POINT_FEATURE_DIM), dtype=torch.float32)
+    index = _as_edge_index(pairs, _index_numpy_dtype(index_dtype))
+    return torch.from_numpy(np.ascontiguousarray(index))
 
-    features = torch.zeros((len(control_points), CONTROL_POINT_FEATURE_DIM), dtype=torch.float32)
-    for i, cp in enumerate(control_points):
-        features[i, 0] = cp.x
-        features[i, 1] = cp.y
-        features[i, 2] = cp.z
-        features[i, 3] = cp.weight
-    return features
 
-
-def build_edge_index(pairs: List[Tuple[int, int]]) -> torch.Tensor:
+def build_edge_indices(
+    pair_lists: List[Union[List[Tuple[int, int]], np.ndarray]],
+    index_dtype: torch.dtype = torch.long,
+    undirected: Iterable[int] = (),
+) -> List[torch.Tensor]:
     """
-    Build edge_index tensor from list of (source, target) pairs.
+    Build several edge_index tensors backed by a single allocation.
+
+    Each relation occupies its own contiguous [2, num_edges] block of one shared
+    index buffer, so the returned tensors are views that need no further copies.
 
     Args:
-        pairs: List of (source_idx, target_idx) tuples
+        pair_lists: One list of (source_idx, target_idx) tuples, or [N, 2] array,
+            per relation
+        index_dtype: torch.long (default) or torch.int32
+        undirected: Positions in `pair_lists` of relations stored one direction
+            per pair; each of their pairs is written followed by its reverse
 
     Returns:
-        Tensor of shape [2, num_edges] in COO format
+        List of tensors of shape [2, num_edges] in COO format, one per input list
     """
-    if not pairs:
-        return torch.empty((2, 0), dtype=torch.long)
-
-    return torch.tensor(pairs, dtype=torch.long).t().contiguous()
+    dtype = _index_numpy_dtype(index_dtype)
+    undirected = set(undirected)
+    indices = [_as_edge_index(pairs, dtype) for pairs in pair_lists]
+    sizes = [
+        index.shape[1] * (2 if i in undirected else 1) for i, index in enumerate(indices)
+    ]
+    offsets = np.cumsum([0] + sizes) * 2
+    buffer = np.empty(offsets[-1], dtype=dtype)
+
+    for i, (index, start, stop) in enumerate(zip(indices, offsets[:-1], offsets[1:])):
+        block = buffer[start:stop].reshape(2, -1)
+        if i in undirected:
+            block[:, 0::2] = index
+            block[:, 1::2] = index[::-1]
+        else:
+            block[...] = index
+
+    index = torch.from_numpy(buffer)
+    return [
+        index[start:stop].view(2, size)
+        for size, start, stop in zip(sizes, offsets[:-1], offsets[1:])
+    ]
@@ -4,9 +4,15 @@ Geometry extraction from CadQuery/OpenCASCADE shapes.
 Extracts geometric parameters from vertices, edges (curves), and faces (surfaces).
 """
 
+import multiprocessing
+import os
 from dataclasses import dataclass
+from io import BytesIO
+from itertools import chain
 from typing import List, Optional, Tuple
 
+import numpy as np
+from OCP.BinTools import BinTools
 from OCP.BRep import BRep_Tool
 from OCP.BRepAdaptor import BRepAdaptor_Curve, BRepAdaptor_Surface
 from OCP.GeomAbs import (
@@ -18,10 +24,16 @@ from OCP.GeomAbs import (
     GeomAbs_SurfaceOfRevolution, GeomAbs_SurfaceOfExtrusion, GeomAbs_OffsetSurface,
     GeomAbs_OtherSurface
 )
-from OCP.TopoDS import TopoDS_Vertex, TopoDS_Edge, TopoDS_Face
+from OCP.TopoDS import TopoDS_Shape, TopoDS_Vertex, TopoDS_Edge, TopoDS_Face
 from OCP.gp import gp_Pnt, gp_Vec, gp_Dir
 
-from .types import CurveType, SurfaceType
+from .topology import extract_topology, TopologyData
+from .types import (
+    CurveType, SurfaceType, CONTROL_POINT_FEATURE_DIM,
+    CURVE_LINE, CURVE_CIRCLE, CURVE_ELLIPSE, CURVE_BEZIER, CURVE_BSPLINE, CURVE_OTHER,
+    SURFACE_PLANE, SURFACE_CYLINDER, SURFACE_CONE, SURFACE_SPHERE, SURFACE_TORUS,
+    SURFACE_BEZIER, SURFACE_BSPLINE, SURFACE_OTHER,
+)
 
 
 # Map OpenCASCADE curve types to our enum
@@ -53,30 +65,39 @@ SURFACE_TYPE_MAP = {
 }
 
 
-@dataclass
-class VertexGeometry:
-    """Geometry data for a vertex."""
-    x: float
-    y: float
-    z: float
+def _build_type_lut(type_map: dict, default: int) -> tuple:
+    """Turn a GeomAbs -> type mapping into a tuple of plain ints indexed by the GeomAbs value."""
+    lut = [default] * (max(occ_type.value for occ_type in type_map) + 1)
+    for occ_type, our_type in type_map.items():
+        lut[occ_type.value] = int(our_type)
+    return tuple(lut)
+
+
+# Lookup tables for the per-entity hot path (tuple indexing beats dict.get on enum keys)
+_CURVE_TYPE_LUT = _build_type_lut(CURVE_TYPE_MAP, CURVE_OTHER)
+_SURFACE_TYPE_LUT = _build_type_lut(SURFACE_TYPE_MAP, SURFACE_OTHER)
 
+# Below this many edges + faces, parallel extraction falls back to running in-process.
+# Measured with processes=2 against serial extraction: the pool costs ~50 ms to start plus
+# ~40-80 us per entity to ship results back, while serial extraction takes ~25 us per
+# analytic and ~100 us per B-spline entity. processes=2 was 2x (1890 B-spline entities)
+# to 9x (306 entities) slower on one core; 4096 keeps start-up under ~10% of a freeform
+# model's serial time, so only models large enough to amortize it go to the pool.
+PARALLEL_MIN_ENTITIES = 4096
 
-@dataclass
-class ControlPoint:
-    """A control point for B-spline curves/surfaces."""
+
+@dataclass(slots=True)
+class VertexGeometry:
+    """Geometry data for a vertex."""
     x: float
     y: float
     z: float
-    weight: float
-    # For curves: sequence index (0, 1, 2, ...)
-    # For surfaces: (u_index, v_index)
-    index: Tuple[int, ...]
 
 
-@dataclass
+@dataclass(slots=True)
 class EdgeGeometry:
     """Geometry data for an edge (curve)."""
-    curve_type: CurveType
+    curve_type: int  # CurveType value
     orientation: int  # +1 forward, -1 reversed
     degree: int
     is_closed: bool
@@ -93,15 +114,16 @@ class EdgeGeometry:
     minor_radius: Optional[float] = None  # For ellipse
 
     # B-spline specific
-    knots: Optional[List[float]] = None
-    multiplicities: Optional[List[int]] = None
-    control_points: Optional[List[ControlPoint]] = None
+    knots: Optional[np.ndarray] = None
+    multiplicities: Optional[np.ndarray] = None
+    control_points: Optional[np.ndarray] = None  # [N, 4]: x, y, z, weight
+    control_point_indices: Optional[np.ndarray] = None  # [N, 1]: sequence index
 
 
-@dataclass
+@dataclass(slots=True)
 class FaceGeometry:
     """Geometry data for a face (surface)."""
-    surface_type: SurfaceType
+    surface_type: int  # SurfaceType value
     orientation: int  # +1 outward normal, -1 reversed
     u_degree: int
     v_degree: int
@@ -126,11 +148,12 @@ class FaceGeometry:
     half_angle: Optional[float] = None
 
     # B-spline specific
-    u_knots: Optional[List[float]] = None
-    v_knots: Optional[List[float]] = None
-    u_multiplicities: Optional[List[int]] = None
-    v_multiplicities: Optional[List[int]] = None
-    control_points: Optional[List[ControlPoint]] = None  # Flattened grid
+    u_knots: Optional[np.ndarray] = None
+    v_knots: Optional[np.ndarray] = None
+    u_multiplicities: Optional[np.ndarray] = None
+    v_multiplicities: Optional[np.ndarray] = None
+    control_points: Optional[np.ndarray] = None  # [N, 4]: x, y, z, weight (flattened grid)
+    control_point_indices: Optional[np.ndarray] = None  # [N, 2]: (u_index, v_index)
 
 
 def _pnt_to_tuple(pnt: gp_Pnt) -> Tuple[float, float, float]:
@@ -143,6 +166,87 @@ def _dir_to_tuple(d: gp_Dir) -> Tuple[float, float, float]:
     return (d.X(), d.Y(), d.Z())
 
 
+def _array1_to_numpy(array, dtype) -> np.ndarray:
+    """Read an OCCT Array1 (knots, multiplicities, weights) into a NumPy array."""
+    # Indexed Value() calls are much cheaper than OCP's iterator protocol on these arrays
+    value = array.Value
+    return np.fromiter(
+        (value(i) for i in range(array.Lower(), array.Upper() + 1)),
+        dtype=dtype,
+        count=array.Length(),
+    )
+
+
+def _knot_vector(knots, multiplicities) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read an OCCT knot vector and its multiplicities into NumPy in a single pass.
+
+    Both arrays share the same bounds, so the length is queried once and the
+    two preallocated outputs are filled together.
+    """
+    count = knots.Length()
+    lower = knots.Lower()
+    knot_values = np.empty(count, dtype=np.float64)
+    mult_values = np.empty(count, dtype=np.int64)
+    knot, mult = knots.Value, multiplicities.Value
+    for i in range(count):
+        knot_values[i] = knot(lower + i)
+        mult_values[i] = mult(lower + i)
+    return knot_values, mult_values
+
+
+def _curve_control_points(poles, weights) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read control points from the bulk pole/weight arrays of a Bezier or B-spline curve.
+
+    `weights` is None for non-rational curves, in which case every weight is 1.0.
+
+    Returns:
+        ([N, 4] array of (x, y, z, weight), [N, 1] array of 0-indexed sequence indices)
+    """
+    n = poles.Length()
+    pole, pnt_to_tuple = poles.Value, _pnt_to_tuple
+    control_points = np.ones((n, CONTROL_POINT_FEATURE_DIM), dtype=np.float64)
+    control_points[:, :3] = np.fromiter(
+        chain.from_iterable(pnt_to_tuple(pole(i)) for i in range(1, n + 1)),
+        dtype=np.float64,
+        count=3 * n,
+    ).reshape(n, 3)
+    if weights is not None:
+        control_points[:, 3] = _array1_to_numpy(weights, np.float64)
+
+    indices = np.arange(n, dtype=np.int64).reshape(n, 1)
+    return control_points, indices
+
+
+def _surface_control_points(poles, weights) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read control points from the bulk pole/weight grids of a Bezier or B-spline surface.
+
+    Rows of the grid run along U and columns along V; the result is flattened
+    row-major. `weights` is None for non-rational surfaces.
+
+    Returns:
+        ([N, 4] array of (x, y, z, weight), [N, 2] array of 0-indexed (u_index, v_index))
+    """
+    nb_u, nb_v = poles.NbRows(), poles.NbColumns()
+    grid = [(ui, vi) for ui in range(1, nb_u + 1) for vi in range(1, nb_v + 1)]
+
+    pole, pnt_to_tuple = poles.Value, _pnt_to_tuple
+    control_points = np.ones((len(grid), CONTROL_POINT_FEATURE_DIM), dtype=np.float64)
+    control_points[:, :3] = np.fromiter(
+        chain.from_iterable(pnt_to_tuple(pole(ui, vi)) for ui, vi in grid),
+        dtype=np.float64,
+        count=3 * len(grid),
+    ).reshape(-1, 3)
+    if weights is not None:
+        weight = weights.Value
+        control_points[:, 3] = [weight(ui, vi) for ui, vi in grid]
+
+    indices = np.indices((nb_u, nb_v), dtype=np.int64).reshape(2, -1).T
+    return control_points, indices
+
+
 def extract_vertex_geometry(vertex: TopoDS_Vertex) -> VertexGeometry:
     """Extract geometry from a vertex."""
     pnt = BRep_Tool.Pnt_s(vertex)
@@ -153,8 +257,10 @@ def extract_edge_geometry(edge: TopoDS_Edge) -> EdgeGeometry:
     """Extract geometry from an edge (curve)."""
     adaptor = BRepAdaptor_Curve(edge)
 
-    occ_type = adaptor.GetType()
-    curve_type = CURVE_TYPE_MAP.get(occ_type, CurveType.OTHER)
+    occ_type = adaptor.GetType().value
+    curve_type = (
+        _CURVE_TYPE_LUT[occ_type] if occ_type < len(_CURVE_TYPE_LUT) else CURVE_OTHER
+    )
 
     # Basic properties
     orientation = 1 if edge.Orientation() == 0 else -1  # TopAbs_FORWARD = 0
@@ -172,19 +278,19 @@ def extract_edge_geometry(edge: TopoDS_Edge) -> EdgeGeometry:
     )
 
     # Type-specific parameters
-    if curve_type == CurveType.LINE:
+    if curve_type == CURVE_LINE:
         line = adaptor.Line()
         geom.degree = 1
         geom.line_direction = _dir_to_tuple(line.Direction())
 
-    elif curve_type == CurveType.CIRCLE:
+    elif curve_type == CURVE_CIRCLE:
         circle = adaptor.Circle()
         geom.degree = 2
         geom.center = _pnt_to_tuple(circle.Location())
         geom.axis = _dir_to_tuple(circle.Axis().Direction())
         geom.radius = circle.Radius()
 
-    elif curve_type == CurveType.ELLIPSE:
+    elif curve_type == CURVE_ELLIPSE:
         ellipse = adaptor.Ellipse()
         geom.degree = 2
         geom.center = _pnt_to_tuple(ellipse.Location())
@@ -192,39 +298,16 @@ def extract_edge_geometry(edge: TopoDS_Edge) -> EdgeGeometry:
         geom.radius = ellipse.MajorRadius()
         geom.minor_radius = ellipse.MinorRadius()
 
-    elif curve_type == CurveType.BSPLINE:
+    elif curve_type == CURVE_BSPLINE:
         bspline = adaptor.BSpline()
         geom.degree = bspline.Degree()
+        geom.knots, geom.multiplicities = _knot_vector(bspline.Knots(), bspline.Multiplicities())
+        geom.control_points, geom.control_point_indices = _curve_control_points(bspline.Poles(), bspline.Weights())
 
-        # Extract knots
-        geom.knots = [bspline.Knot(i) for i in range(1, bspline.NbKnots() + 1)]
-        geom.multiplicities = [bspline.Multiplicity(i) for i in range(1, bspline.NbKnots() + 1)]
-
-        # Extract control points
-        geom.control_points = []
-        for i in range(1, bspline.NbPoles() + 1):
-            pole = bspline.Pole(i)
-            weight = bspline.Weight(i) if bspline.IsRational() else 1.0
-            geom.control_points.append(ControlPoint(
-                x=pole.X(), y=pole.Y(), z=pole.Z(),
-                weight=weight,
-                index=(i - 1,)  # 0-indexed
-            ))
-
-    elif curve_type == CurveType.BEZIER:
+    elif curve_type == CURVE_BEZIER:
         bezier = adaptor.Bezier()
         geom.degree = bezier.Degree()
-
-        # Extract control points
-        geom.control_points = []
-        for i in range(1, bezier.NbPoles() + 1):
-            pole = bezier.Pole(i)
-            weight = bezier.Weight(i) if bezier.IsRational() else 1.0
-            geom.control_points.append(ControlPoint(
-                x=pole.X(), y=pole.Y(), z=pole.Z(),
-                weight=weight,
-                index=(i - 1,)
-            ))
+        geom.control_points, geom.control_point_indices = _curve_control_points(bezier.Poles(), bezier.Weights())
 
     return geom
 
@@ -233,8 +316,10 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
     """Extract geometry from a face (surface)."""
     adaptor = BRepAdaptor_Surface(face)
 
-    occ_type = adaptor.GetType()
-    surface_type = SURFACE_TYPE_MAP.get(occ_type, SurfaceType.OTHER)
+    occ_type = adaptor.GetType().value
+    surface_type = (
+        _SURFACE_TYPE_LUT[occ_type] if occ_type < len(_SURFACE_TYPE_LUT) else SURFACE_OTHER
+    )
 
     # Basic properties
     orientation = 1 if face.Orientation() == 0 else -1  # TopAbs_FORWARD = 0
@@ -257,14 +342,14 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
     )
 
     # Type-specific parameters
-    if surface_type == SurfaceType.PLANE:
+    if surface_type == SURFACE_PLANE:
         plane = adaptor.Plane()
         geom.u_degree = 1
         geom.v_degree = 1
         geom.plane_normal = _dir_to_tuple(plane.Axis().Direction())
         geom.plane_origin = _pnt_to_tuple(plane.Location())
 
-    elif surface_type == SurfaceType.CYLINDER:
+    elif surface_type == SURFACE_CYLINDER:
         cylinder = adaptor.Cylinder()
         geom.u_degree = 2
         geom.v_degree = 1
@@ -272,7 +357,7 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
         geom.axis_origin = _pnt_to_tuple(cylinder.Location())
         geom.radius = cylinder.Radius()
 
-    elif surface_type == SurfaceType.CONE:
+    elif surface_type == SURFACE_CONE:
         cone = adaptor.Cone()
         geom.u_degree = 2
         geom.v_degree = 1
@@ -281,7 +366,7 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
         geom.radius = cone.RefRadius()
         geom.half_angle = cone.SemiAngle()
 
-    elif surface_type == SurfaceType.SPHERE:
+    elif surface_type == SURFACE_SPHERE:
         sphere = adaptor.Sphere()
         geom.u_degree = 2
         geom.v_degree = 2
@@ -289,7 +374,7 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
         geom.axis_origin = _pnt_to_tuple(sphere.Location())
         geom.radius = sphere.Radius()
 
-    elif surface_type == SurfaceType.TORUS:
+    elif surface_type == SURFACE_TORUS:
         torus = adaptor.Torus()
         geom.u_degree = 2
         geom.v_degree = 2
@@ -298,46 +383,104 @@ def extract_face_geometry(face: TopoDS_Face) -> FaceGeometry:
         geom.radius = torus.MajorRadius()
         geom.radius2 = torus.MinorRadius()
 
-    elif surface_type == SurfaceType.BSPLINE:
+    elif surface_type == SURFACE_BSPLINE:
         bspline = adaptor.BSpline()
         geom.u_degree = bspline.UDegree()
         geom.v_degree = bspline.VDegree()
+        geom.u_knots, geom.u_multiplicities = _knot_vector(bspline.UKnots(), bspline.UMultiplicities())
+        geom.v_knots, geom.v_multiplicities = _knot_vector(bspline.VKnots(), bspline.VMultiplicities())
+        geom.control_points, geom.control_point_indices = _surface_control_points(bspline.Poles(), bspline.Weights())
 
-        # Extract U knots
-        geom.u_knots = [bspline.UKnot(i) for i in range(1, bspline.NbUKnots() + 1)]
-        geom.u_multiplicities = [bspline.UMultiplicity(i) for i in range(1, bspline.NbUKnots() + 1)]
-
-        # Extract V knots
-        geom.v_knots = [bspline.VKnot(i) for i in range(1, bspline.NbVKnots() + 1)]
-        geom.v_multiplicities = [bspline.VMultiplicity(i) for i in range(1, bspline.NbVKnots() + 1)]
-
-        # Extract control points (2D grid flattened)
-        geom.control_points = []
-        for ui in range(1, bspline.NbUPoles() + 1):
-            for vi in range(1, bspline.NbVPoles() + 1):
-                pole = bspline.Pole(ui, vi)
-                weight = bspline.Weight(ui, vi) if bspline.IsURational() or bspline.IsVRational() else 1.0
-                geom.control_points.append(ControlPoint(
-                    x=pole.X(), y=pole.Y(), z=pole.Z(),
-                    weight=weight,
-                    index=(ui - 1, vi - 1)  # 0-indexed
-                ))
-
-    elif surface_type == SurfaceType.BEZIER:
+    elif surface_type == SURFACE_BEZIER:
         bezier = adaptor.Bezier()
         geom.u_degree = bezier.UDegree()
         geom.v_degree = bezier.VDegree()
-
-        # Extract control points (2D grid flattened)
-        geom.control_points = []
-        for ui in range(1, bezier.NbUPoles() + 1):
-            for vi in range(1, bezier.NbVPoles() + 1):
-                pole = bezier.Pole(ui, vi)
-                weight = bezier.Weight(ui, vi) if bezier.IsURational() or bezier.IsVRational() else 1.0
-                geom.control_points.append(ControlPoint(
-                    x=pole.X(), y=pole.Y(), z=pole.Z(),
-                    weight=weight,
-                    index=(ui - 1, vi - 1)
-                ))
+        geom.control_points, geom.control_point_indices = _surface_control_points(bezier.Poles(), bezier.Weights())
 
     return geom
+
+
+def _serialize_shape(shape: TopoDS_Shape) -> bytes:
+    """Serialize a shape, including its location and orientation, to OCCT binary BRep."""
+    stream = BytesIO()
+    BinTools.Write_s(shape, stream)
+    return stream.getvalue()
+
+
+def _deserialize_shape(payload: bytes) -> TopoDS_Shape:
+    """Inverse of _serialize_shape."""
+    shape = TopoDS_Shape()
+    BinTools.Read_s(shape, BytesIO(payload))
+    return shape
+
+
+# Topology of the shape being converted, rebuilt once in each worker process
+_worker_topology = None
+
+
+def _init_worker(payload: bytes) -> None:
+    """Worker initializer: rebuild the topology of the serialized shape."""
+    global _worker_topology
+    # Workers only index edges and faces, so skip the relationship passes
+    _worker_topology = extract_topology(
+        _deserialize_shape(payload), vertex_edge=False, edge_face=False, face_adjacency=False
+    )
+
+
+def _extract_edge_range(bounds: Tuple[int, int]) -> List[EdgeGeometry]:
+    """Worker entry point: extract geometry for edges[start:stop] of the worker topology."""
+    start, stop = bounds
+    return [extract_edge_geometry(e) for e in _worker_topology.edges[start:stop]]
+
+
+def _extract_face_range(bounds: Tuple[int, int]) -> List[FaceGeometry]:
+    """Worker entry point: extract geometry for faces[start:stop] of the worker topology."""
+    start, stop = bounds
+    return [extract_face_geometry(f) for f in _worker_topology.faces[start:stop]]
+
+
+def _chunk_bounds(count: int, chunksize: int) -> List[Tuple[int, int]]:
+    """Split range(count) into consecutive (start, stop) chunks."""
+    return [(start, min(start + chunksize, count)) for start in range(0, count, chunksize)]
+
+
+def extract_geometry_parallel(
+    shape: TopoDS_Shape,
+    topo: TopologyData,
+    processes: Optional[int] = None,
+) -> Tuple[List[EdgeGeometry], List[FaceGeometry]]:
+    """
+    Extract edge and face geometry across a pool of worker processes.
+
+    OCP shapes cannot be pickled, so the whole shape is sent once to each worker
+    as binary BRep. Each worker rebuilds the same topology, whose entity order is
+    deterministic, and tasks carry only index ranges. Shapes with fewer than
+    PARALLEL_MIN_ENTITIES edges + faces are extracted in-process instead.
+
+    Args:
+        shape: The shape `topo` was extracted from
+        topo: Topology of `shape`
+        processes: Number of worker processes (None uses os.cpu_count())
+
+    Returns:
+        (edge geometries, face geometries), in topology order
+    """
+    if len(topo.edges) + len(topo.faces) < PARALLEL_MIN_ENTITIES:
+        return (
+            [extract_edge_geometry(e) for e in topo.edges],
+            [extract_face_geometry(f) for f in topo.faces],
+        )
+
+    processes = processes or os.cpu_count() or 1
+    with multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(_serialize_shape(shape),)
+    ) as pool:
+        edge_chunks = pool.map(
+            _extract_edge_range,
+            _chunk_bounds(len(topo.edges), max(1, len(topo.edges) // (4 * processes))),
+        )
+        face_chunks = pool.map(
+            _extract_face_range,
+            _chunk_bounds(len(topo.faces), max(1, len(topo.faces) // (4 * processes))),
+        )
+    return list(chain.from_iterable(edge_chunks)), list(chain.from_iterable(face_chunks))
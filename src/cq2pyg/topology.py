@@ -5,135 +5,224 @@ Extracts vertices, edges, and faces along with their relationships.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
-from OCP.TopExp import TopExp, TopExp_Explorer
+import numpy as np
+
+from OCP.BRep import BRep_Builder
+from OCP.TopExp import TopExp
 from OCP.TopAbs import TopAbs_VERTEX, TopAbs_EDGE, TopAbs_FACE, TopAbs_WIRE
-from OCP.TopoDS import TopoDS, TopoDS_Shape, TopoDS_Vertex, TopoDS_Edge, TopoDS_Face, TopoDS_Wire
-from OCP.TopTools import TopTools_IndexedDataMapOfShapeListOfShape, TopTools_IndexedMapOfShape
+from OCP.TopoDS import TopoDS, TopoDS_Compound, TopoDS_Shape, TopoDS_Vertex, TopoDS_Edge, TopoDS_Face, TopoDS_Wire
+from OCP.TopTools import (
+    TopTools_IndexedDataMapOfShapeListOfShape,
+    TopTools_IndexedMapOfShape,
+    TopTools_ListOfShape,
+)
+
+from .cache import ShapeCache
+
+
+def _empty_index() -> np.ndarray:
+    """An empty [2, 0] int64 relationship array."""
+    return np.empty((2, 0), dtype=np.int64)
 
 
 @dataclass
 class TopologyData:
     """Container for extracted topology data."""
 
-    # Maps from shape hash to index
-    vertex_map: Dict[int, int] = field(default_factory=dict)
-    edge_map: Dict[int, int] = field(default_factory=dict)
-    face_map: Dict[int, int] = field(default_factory=dict)
+    # Indexed maps of the shape's sub-shapes; FindIndex(shape) - 1 is the shape's index
+    vertex_map: TopTools_IndexedMapOfShape = field(default_factory=TopTools_IndexedMapOfShape)
+    edge_map: TopTools_IndexedMapOfShape = field(default_factory=TopTools_IndexedMapOfShape)
+    face_map: TopTools_IndexedMapOfShape = field(default_factory=TopTools_IndexedMapOfShape)
 
     # Lists of shapes (indexed by their map values)
     vertices: List[TopoDS_Vertex] = field(default_factory=list)
     edges: List[TopoDS_Edge] = field(default_factory=list)
     faces: List[TopoDS_Face] = field(default_factory=list)
 
-    # Relationships as (source_idx, target_idx) pairs
-    vertex_to_edge: List[Tuple[int, int]] = field(default_factory=list)  # vertex bounds edge
-    edge_to_face: List[Tuple[int, int]] = field(default_factory=list)    # edge bounds face
-    face_to_face: List[Tuple[int, int]] = field(default_factory=list)    # faces are adjacent
+    # Relationships as [2, N] int64 (source_idx, target_idx) arrays
+    vertex_to_edge: np.ndarray = field(default_factory=_empty_index)  # vertex bounds edge
+    edge_to_face: np.ndarray = field(default_factory=_empty_index)    # edge bounds face
+    face_to_face: np.ndarray = field(default_factory=_empty_index)    # faces are adjacent
+
+    # face_to_face holds each adjacency once (f1 <= f2); consumers add the reverse direction
+    undirected: bool = True
+
+
+# Maximum number of extracted topologies kept when topology caching is enabled
+TOPOLOGY_CACHE_SIZE = 128
 
+# Topologies memoized by `cache=True` extractions, keyed by shape and relationship flags
+_topology_cache = ShapeCache(TOPOLOGY_CACHE_SIZE)
 
-def _shape_hash(shape: TopoDS_Shape) -> int:
-    """Get a unique hash for a TopoDS_Shape based on its underlying TShape."""
-    return hash(shape)
 
+def clear_topology_cache() -> None:
+    """Drop all topologies memoized by `cache=True` extractions."""
+    _topology_cache.clear()
 
-def extract_topology(shape: TopoDS_Shape) -> TopologyData:
+
+def _map_shapes(shape: TopoDS_Shape, kind, shape_map: TopTools_IndexedMapOfShape, cast) -> list:
+    """
+    Fill `shape_map` with the distinct sub-shapes of `shape` of type `kind`.
+
+    TopExp.MapShapes collects and deduplicates them (by IsSame) in one call.
+
+    Returns:
+        The sub-shapes in map order, downcast with `cast`
+    """
+    TopExp.MapShapes_s(shape, kind, shape_map)
+    find_key = shape_map.FindKey
+    return [cast(find_key(i)) for i in range(1, shape_map.Extent() + 1)]
+
+
+def _ancestor_indices(
+    parents: list,
+    child_kind,
+    parent_kind,
+    child_map: TopTools_IndexedMapOfShape,
+    parent_map: TopTools_IndexedMapOfShape,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the parents of every child sub-shape of `parents`.
+
+    The parents are mapped through a compound so each is visited exactly once;
+    a child that occurs twice in one parent (a seam edge, the vertex of a
+    closed edge) lists that parent twice.
+
+    Returns:
+        (child indices, number of parents of each child, parent indices
+         concatenated), in TopExp.MapShapesAndAncestors order
+    """
+    compound = TopoDS_Compound()
+    builder = BRep_Builder()
+    builder.MakeCompound(compound)
+    add = builder.Add
+    for parent in parents:
+        add(compound, parent)
+
+    ancestor_map = TopTools_IndexedDataMapOfShapeListOfShape()
+    TopExp.MapShapesAndAncestors_s(compound, child_kind, parent_kind, ancestor_map)
+
+    # The loop makes a handful of tiny OCP calls per child, so bind them once.
+    # Iterating the OCP list wrapper directly costs a few hundred microseconds
+    # per list; draining it with First/RemoveFirst is about a hundred times cheaper.
+    find_key = ancestor_map.FindKey
+    parents_of = ancestor_map.ChangeFromIndex
+    find_child = child_map.FindIndex
+    find_parent = parent_map.FindIndex
+    is_empty = TopTools_ListOfShape.IsEmpty
+    first = TopTools_ListOfShape.First
+    remove_first = TopTools_ListOfShape.RemoveFirst
+
+    children, counts, parent_indices = [], [], []
+    add_child, add_count, add_parent = children.append, counts.append, parent_indices.append
+    # Children and parents are all sub-shapes of the mapped shape, so FindIndex never misses
+    for i in range(1, ancestor_map.Extent() + 1):
+        add_child(find_child(find_key(i)) - 1)
+        parent_list = parents_of(i)
+        before = len(parent_indices)
+        while not is_empty(parent_list):
+            add_parent(find_parent(first(parent_list)) - 1)
+            remove_first(parent_list)
+        add_count(len(parent_indices) - before)
+
+    return (
+        np.array(children, dtype=np.int64),
+        np.array(counts, dtype=np.int64),
+        np.array(parent_indices, dtype=np.int64),
+    )
+
+
+def _incidence(children: np.ndarray, counts: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """Expand CSR child -> parents lists into a [2, N] (child_idx, parent_idx) array."""
+    return np.stack((np.repeat(children, counts), parents))
+
+
+def _face_adjacency(counts: np.ndarray, faces: np.ndarray, num_faces: int) -> np.ndarray:
+    """
+    Pair up the faces that share an edge.
+
+    Each unordered pair appears once, as (f1, f2) with f1 <= f2, however many
+    edges the two faces share. A face meeting itself along a seam edge pairs
+    with itself.
+
+    Args:
+        counts: Number of faces of each edge
+        faces: The edges' face indices, concatenated
+        num_faces: Total number of faces
+
+    Returns:
+        [2, N] array of (face_idx, face_idx) pairs, sorted
+    """
+    starts = np.cumsum(counts) - counts
+
+    # Edges with the same number of faces are paired in one batch; each pair
+    # (f1 <= f2) is keyed as the scalar f1 * num_faces + f2
+    keys = [np.empty(0, dtype=np.int64)]
+    for k in np.unique(counts[counts >= 2]).tolist():
+        groups = faces[starts[counts == k, None] + np.arange(k)]
+        rows, cols = np.triu_indices(k, 1)
+        first, second = groups[:, rows].ravel(), groups[:, cols].ravel()
+        keys.append(np.minimum(first, second) * num_faces + np.maximum(first, second))
+
+    return np.stack(np.divmod(np.unique(np.concatenate(keys)), num_faces))
+
+
+def extract_topology(
+    shape: TopoDS_Shape,
+    cache: bool = False,
+    *,
+    vertex_edge: bool = True,
+    edge_face: bool = True,
+    face_adjacency: bool = True,
+) -> TopologyData:
     """
     Extract all topological entities and relationships from a shape.
 
     Args:
         shape: A TopoDS_Shape (the wrapped OCP shape from CadQuery)
+        cache: Memoize the result, keyed by the shape's TShape, location and
+            orientation. A hit returns the cached TopologyData itself, so treat
+            it as read-only; a shape modified in place after extraction must be
+            dropped with clear_topology_cache().
+        vertex_edge: Build vertex_to_edge
+        edge_face: Build edge_to_face
+        face_adjacency: Build face_to_face
 
     Returns:
-        TopologyData containing all vertices, edges, faces and their relationships
+        TopologyData containing all vertices, edges, faces and the requested
+        relationships; skipped relationships are left empty
     """
-    data = TopologyData()
+    if cache:
+        options = (vertex_edge, edge_face, face_adjacency)
+        cached = _topology_cache.get(shape, options)
+        if cached is not None:
+            return cached
 
-    # Extract all vertices
-    vertex_explorer = TopExp_Explorer(shape, TopAbs_VERTEX)
-    while vertex_explorer.More():
-        vertex = TopoDS.Vertex_s(vertex_explorer.Current())
-        h = _shape_hash(vertex)
-        if h not in data.vertex_map:
-            idx = len(data.vertices)
-            data.vertex_map[h] = idx
-            data.vertices.append(vertex)
-        vertex_explorer.Next()
-
-    # Extract all edges
-    edge_explorer = TopExp_Explorer(shape, TopAbs_EDGE)
-    while edge_explorer.More():
-        edge = TopoDS.Edge_s(edge_explorer.Current())
-        h = _shape_hash(edge)
-        if h not in data.edge_map:
-            idx = len(data.edges)
-            data.edge_map[h] = idx
-            data.edges.append(edge)
-        edge_explorer.Next()
-
-    # Extract all faces
-    face_explorer = TopExp_Explorer(shape, TopAbs_FACE)
-    while face_explorer.More():
-        face = TopoDS.Face_s(face_explorer.Current())
-        h = _shape_hash(face)
-        if h not in data.face_map:
-            idx = len(data.faces)
-            data.face_map[h] = idx
-            data.faces.append(face)
-        face_explorer.Next()
-
-    # Build vertex-to-edge relationships
-    for edge_idx, edge in enumerate(data.edges):
-        # Get vertices of this edge
-        v_explorer = TopExp_Explorer(edge, TopAbs_VERTEX)
-        while v_explorer.More():
-            vertex = TopoDS.Vertex_s(v_explorer.Current())
-            h = _shape_hash(vertex)
-            if h in data.vertex_map:
-                vertex_idx = data.vertex_map[h]
-                data.vertex_to_edge.append((vertex_idx, edge_idx))
-            v_explorer.Next()
-
-    # Build edge-to-face relationships
-    for face_idx, face in enumerate(data.faces):
-        # Get edges of this face
-        e_explorer = TopExp_Explorer(face, TopAbs_EDGE)
-        while e_explorer.More():
-            edge = TopoDS.Edge_s(e_explorer.Current())
-            h = _shape_hash(edge)
-            if h in data.edge_map:
-                edge_idx = data.edge_map[h]
-                data.edge_to_face.append((edge_idx, face_idx))
-            e_explorer.Next()
-
-    # Build face-to-face adjacency (faces sharing an edge)
-    # Use TopExp.MapShapesAndAncestors to find which faces each edge belongs to
-    edge_face_map = TopTools_IndexedDataMapOfShapeListOfShape()
-    TopExp.MapShapesAndAncestors_s(shape, TopAbs_EDGE, TopAbs_FACE, edge_face_map)
-
-    adjacency_set = set()  # To avoid duplicate pairs
-
-    for i in range(1, edge_face_map.Extent() + 1):
-        edge = edge_face_map.FindKey(i)
-        face_list = edge_face_map.FindFromIndex(i)
-
-        # Get all faces adjacent to this edge
-        # OCP wraps TopTools_ListOfShape as a Python iterable
-        adjacent_face_indices = []
-        for face_shape in face_list:
-            face = TopoDS.Face_s(face_shape)
-            h = _shape_hash(face)
-            if h in data.face_map:
-                adjacent_face_indices.append(data.face_map[h])
-
-        # Create adjacency pairs
-        for i1 in range(len(adjacent_face_indices)):
-            for i2 in range(i1 + 1, len(adjacent_face_indices)):
-                f1, f2 = adjacent_face_indices[i1], adjacent_face_indices[i2]
-                if (f1, f2) not in adjacency_set and (f2, f1) not in adjacency_set:
-                    adjacency_set.add((f1, f2))
-                    data.face_to_face.append((f1, f2))
-                    data.face_to_face.append((f2, f1))  # Bidirectional
+    data = TopologyData()
 
+    # Extract all vertices, edges and faces
+    data.vertices = _map_shapes(shape, TopAbs_VERTEX, data.vertex_map, TopoDS.Vertex_s)
+    data.edges = _map_shapes(shape, TopAbs_EDGE, data.edge_map, TopoDS.Edge_s)
+    data.faces = _map_shapes(shape, TopAbs_FACE, data.face_map, TopoDS.Face_s)
+
+    # Build vertex-to-edge and edge-to-face relationships
+    if vertex_edge:
+        data.vertex_to_edge = _incidence(
+            *_ancestor_indices(data.edges, TopAbs_VERTEX, TopAbs_EDGE, data.vertex_map, data.edge_map)
+        )
+    if edge_face or face_adjacency:
+        edges, face_counts, edge_faces = _ancestor_indices(
+            data.faces, TopAbs_EDGE, TopAbs_FACE, data.edge_map, data.face_map
+        )
+        if edge_face:
+            data.edge_to_face = _incidence(edges, face_counts, edge_faces)
+
+        # Build face-to-face adjacency (faces sharing an edge)
+        if face_adjacency:
+            data.face_to_face = _face_adjacency(face_counts, edge_faces, len(data.faces))
+
+    if cache:
+        _topology_cache.put(shape, options, data)
     return data
@@ -5,6 +5,7 @@ These map OpenCASCADE GeomAbs types to integer indices for one-hot encoding.
 """
 
 from enum import IntEnum
+from typing import Final
 
 
 class CurveType(IntEnum):
@@ -35,9 +36,33 @@ class SurfaceType(IntEnum):
     OTHER = 10
 
 
+# Plain-int copies of the type values for per-entity hot paths; comparing against
+# these skips the enum attribute lookup, and NumPy converts them without __index__
+CURVE_LINE: Final = int(CurveType.LINE)
+CURVE_CIRCLE: Final = int(CurveType.CIRCLE)
+CURVE_ELLIPSE: Final = int(CurveType.ELLIPSE)
+CURVE_HYPERBOLA: Final = int(CurveType.HYPERBOLA)
+CURVE_PARABOLA: Final = int(CurveType.PARABOLA)
+CURVE_BEZIER: Final = int(CurveType.BEZIER)
+CURVE_BSPLINE: Final = int(CurveType.BSPLINE)
+CURVE_OFFSET: Final = int(CurveType.OFFSET)
+CURVE_OTHER: Final = int(CurveType.OTHER)
+
+SURFACE_PLANE: Final = int(SurfaceType.PLANE)
+SURFACE_CYLINDER: Final = int(SurfaceType.CYLINDER)
+SURFACE_CONE: Final = int(SurfaceType.CONE)
+SURFACE_SPHERE: Final = int(SurfaceType.SPHERE)
+SURFACE_TORUS: Final = int(SurfaceType.TORUS)
+SURFACE_BEZIER: Final = int(SurfaceType.BEZIER)
+SURFACE_BSPLINE: Final = int(SurfaceType.BSPLINE)
+SURFACE_REVOLUTION: Final = int(SurfaceType.REVOLUTION)
+SURFACE_EXTRUSION: Final = int(SurfaceType.EXTRUSION)
+SURFACE_OFFSET: Final = int(SurfaceType.OFFSET)
+SURFACE_OTHER: Final = int(SurfaceType.OTHER)
+
 # Number of types for one-hot encoding dimensions
-NUM_CURVE_TYPES = len(CurveType)
-NUM_SURFACE_TYPES = len(SurfaceType)
+NUM_CURVE_TYPES: Final = len(CurveType)
+NUM_SURFACE_TYPES: Final = len(SurfaceType)
 
 # Feature dimensions
 VERTEX_FEATURE_DIM = 3  # x, y, z
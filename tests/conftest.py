@@ -0,0 +1,251 @@
+"""
+Shared fixtures for cq2pyg tests.
+
+Every CadQuery shape used by more than one test is built once per session by a
+`*_shape` fixture, and converted at most once per converter through `convert`.
+The canonical shapes in SHAPES are converted up front in pytest_configure and
+served by same-named fixtures.
+Converted graphs come with their per-face and per-edge type indices. Tests only
+read from them, so sharing a HeteroData object is safe.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import pytest
+import cadquery as cq
+
+from cq2pyg import cadquery_to_pyg, cadquery_to_pyg_simple
+from cq2pyg.types import NUM_CURVE_TYPES, NUM_SURFACE_TYPES
+
+
+# A converted graph with its surface/curve type indices decoded from the one-hots
+Converted = namedtuple('Converted', ['data', 'face_types', 'edge_types'])
+
+
+@lru_cache(maxsize=None)
+def _convert(shape, simple=False):
+    """
+    Convert a session shape with cadquery_to_pyg (or cadquery_to_pyg_simple).
+
+    Cached on the shape object, which the session fixtures keep alive, so each
+    shape is converted once per converter.
+    """
+    data = cadquery_to_pyg_simple(shape) if simple else cadquery_to_pyg(shape)
+    return Converted(
+        data,
+        data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1),
+        data['edge'].x[:, :NUM_CURVE_TYPES].argmax(dim=1),
+    )
+
+
+def _spline_extrude(points):
+    """Closed spline through `points`, extruded by 1."""
+    return cq.Workplane("XY").spline(points).close().extrude(1)
+
+
+# Shapes most tests run on, built and converted (with both converters) once per process
+_CANONICAL_SHAPES = {
+    'box10': lambda: cq.Workplane("XY").box(10, 10, 10),
+    'cylinder_10_5': lambda: cq.Workplane("XY").cylinder(10, 5),
+    'sphere_5': lambda: cq.Workplane("XY").sphere(5),
+    'spline_extrude': lambda: _spline_extrude([(0, 0), (1, 1), (2, 0), (3, 1)]),
+    'spline_arch': lambda: _spline_extrude([(0, 0), (1, 2), (3, 2), (4, 0)]),
+}
+
+# name -> Workplane, and name (or name + '_simple') -> Converted
+WORKPLANES = {}
+SHAPES = {}
+
+
+def pytest_configure(config):
+    """Build and convert the canonical shapes before any test runs."""
+    # Under xdist only the workers run tests, so the controller skips the work
+    if getattr(config.option, 'numprocesses', None) and not hasattr(config, 'workerinput'):
+        return
+    for name, build in _CANONICAL_SHAPES.items():
+        shape = WORKPLANES[name] = build()
+        SHAPES[name] = _convert(shape)
+        SHAPES[name + '_simple'] = _convert(shape, simple=True)
+
+
+@pytest.fixture(scope="session")
+def convert():
+    """Cached `convert(shape, simple=False) -> Converted` for the session shapes."""
+    return _convert
+
+
+# Shapes
+
+@pytest.fixture(scope="session")
+def box5():
+    """5x5x5 box, for tests that vary the input wrapper."""
+    return cq.Workplane("XY").box(5, 5, 5)
+
+
+@pytest.fixture(scope="session")
+def box10_shape():
+    """10x10x10 box."""
+    return WORKPLANES['box10']
+
+
+@pytest.fixture(scope="session")
+def cylinder_10_5_shape():
+    """Cylinder with height 10 and radius 5."""
+    return WORKPLANES['cylinder_10_5']
+
+
+@pytest.fixture(scope="session")
+def sphere_5_shape():
+    """Sphere with radius 5."""
+    return WORKPLANES['sphere_5']
+
+
+@pytest.fixture(scope="session")
+def sphere_7_5_shape():
+    """Sphere with radius 7.5."""
+    return cq.Workplane("XY").sphere(7.5)
+
+
+@pytest.fixture(scope="session")
+def spline_extrude_shape():
+    """Extruded closed spline through (0,0), (1,1), (2,0), (3,1)."""
+    return WORKPLANES['spline_extrude']
+
+
+@pytest.fixture(scope="session")
+def spline_arch_shape():
+    """Extruded closed spline through (0,0), (1,2), (3,2), (4,0)."""
+    return WORKPLANES['spline_arch']
+
+
+@pytest.fixture(scope="session")
+def fillet_box_shape():
+    """10x10x10 box with every edge filleted (radius 1)."""
+    return cq.Workplane("XY").box(10, 10, 10).edges().fillet(1)
+
+
+@pytest.fixture(scope="session")
+def chamfer_box_shape():
+    """10x10x10 box with every edge chamfered (length 1)."""
+    return cq.Workplane("XY").box(10, 10, 10).edges().chamfer(1)
+
+
+@pytest.fixture(scope="session")
+def loft_shape():
+    """Loft from a 10x10 square to a radius 5 circle 10 above it."""
+    return (
+        cq.Workplane("XY")
+        .rect(10, 10)
+        .workplane(offset=10)
+        .circle(5)
+        .loft()
+    )
+
+
+@pytest.fixture(scope="session")
+def revolved_cone_shape():
+    """Cone (radius 5, height 10) revolved from a triangle."""
+    return (
+        cq.Workplane("XZ")
+        .moveTo(0, 0)
+        .lineTo(5, 0)
+        .lineTo(0, 10)
+        .close()
+        .revolve(360)
+    )
+
+
+@pytest.fixture(scope="session")
+def torus_shape():
+    """Torus revolved from a radius 3 circle centered 10 from the axis."""
+    return (
+        cq.Workplane("XZ")
+        .center(10, 0)
+        .circle(3)
+        .revolve(360, (0, 0, 0), (0, 0, 1))
+    )
+
+
+@pytest.fixture(scope="session")
+def union_shape():
+    """Union of two overlapping 10x10x10 boxes offset by 5 in x."""
+    box1 = cq.Workplane("XY").box(10, 10, 10)
+    box2 = cq.Workplane("XY").center(5, 0).box(10, 10, 10)
+    return box1.union(box2)
+
+
+@pytest.fixture(scope="session")
+def difference_shape():
+    """20x20x20 box with a diameter 5 hole through the top face."""
+    return cq.Workplane("XY").box(20, 20, 20).faces(">Z").workplane().hole(5)
+
+
+@pytest.fixture(scope="session")
+def compound_shape():
+    """Compound of two disjoint 5x5x5 boxes."""
+    box1 = cq.Workplane("XY").box(5, 5, 5).val()
+    box2 = cq.Workplane("XY").center(20, 0).box(5, 5, 5).val()
+    return cq.Compound.makeCompound([box1, box2])
+
+
+@pytest.fixture(scope="session")
+def shell_shape():
+    """10x10x10 box hollowed to a shell of thickness 1."""
+    return cq.Workplane("XY").box(10, 10, 10).shell(-1)
+
+
+@pytest.fixture(scope="session")
+def wedge_shape():
+    """Triangular prism: a triangle of diameter 10 extruded by 10."""
+    return cq.Workplane("XY").polygon(3, 10).extrude(10)
+
+
+# Converted shapes
+
+@pytest.fixture(scope="session")
+def box10():
+    """Full conversion of a 10x10x10 box."""
+    return SHAPES['box10']
+
+
+@pytest.fixture(scope="session")
+def box10_simple():
+    """Simple conversion of a 10x10x10 box."""
+    return SHAPES['box10_simple']
+
+
+@pytest.fixture(scope="session")
+def cylinder_10_5():
+    """Full conversion of a cylinder with height 10 and radius 5."""
+    return SHAPES['cylinder_10_5']
+
+
+@pytest.fixture(scope="session")
+def cylinder_10_5_simple():
+    """Simple conversion of a cylinder with height 10 and radius 5."""
+    return SHAPES['cylinder_10_5_simple']
+
+
+@pytest.fixture(scope="session")
+def sphere_5():
+    """Full conversion of a sphere with radius 5."""
+    return SHAPES['sphere_5']
+
+
+@pytest.fixture(scope="session")
+def sphere_5_simple():
+    """Simple conversion of a sphere with radius 5."""
+    return SHAPES['sphere_5_simple']
+
+
+@pytest.fixture(scope="session")
+def spline_extrude():
+    """Full conversion of the extruded closed spline through (0,0), (1,1), (2,0), (3,1)."""
+    return SHAPES['spline_extrude']
+
+
+@pytest.fixture(scope="session")
+def spline_arch():
+    """Full conversion of the extruded closed spline through (0,0), (1,2), (3,2), (4,0)."""
+    return SHAPES['spline_arch']
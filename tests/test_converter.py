@@ -3,11 +3,15 @@ Tests for the CadQuery to PyG converter.
 """
 
 import math
+import numpy as np
 import pytest
 import torch
 import cadquery as cq
+from torch_geometric.data import Batch
 
-from cq2pyg import cadquery_to_pyg, cadquery_to_pyg_simple, CurveType, SurfaceType
+from cq2pyg import cadquery_to_pyg, cadquery_to_pyg_simple, clear_conversion_cache, CurveType, SurfaceType
+from cq2pyg.features import build_edge_index, build_edge_indices
+from cq2pyg.topology import extract_topology
 from cq2pyg.types import (
     VERTEX_FEATURE_DIM, EDGE_FEATURE_DIM, FACE_FEATURE_DIM, CONTROL_POINT_FEATURE_DIM,
     NUM_CURVE_TYPES, NUM_SURFACE_TYPES
@@ -17,10 +21,9 @@ from cq2pyg.types import (
 class TestBasicShapes:
     """Test conversion of basic geometric shapes."""
 
-    def test_box(self):
+    def test_box(self, box10):
         """Test converting a simple box."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         # A box has 8 vertices, 12 edges, 6 faces
         assert data['vertex'].x.shape[0] == 8
@@ -31,11 +34,11 @@ class TestBasicShapes:
         assert data['vertex'].x.shape[1] == 3
 
         # All faces should be planes
-        face_types = data['face'].x[:, :SurfaceType.OTHER + 1].argmax(dim=1)
+        face_types = box10.face_types
         assert (face_types == SurfaceType.PLANE).all()
 
         # All edges should be lines
-        edge_types = data['edge'].x[:, :CurveType.OTHER + 1].argmax(dim=1)
+        edge_types = box10.edge_types
         assert (edge_types == CurveType.LINE).all()
 
         # Check relationships exist
@@ -43,49 +46,38 @@ class TestBasicShapes:
         assert data['edge', 'bounds', 'face'].edge_index.shape[1] > 0
         assert data['face', 'adjacent', 'face'].edge_index.shape[1] > 0
 
-    def test_cylinder(self):
+    def test_cylinder(self, cylinder_10_5):
         """Test converting a cylinder."""
-        cylinder = cq.Workplane("XY").cylinder(10, 5)
-        data = cadquery_to_pyg(cylinder)
+        data = cylinder_10_5.data
 
         # A cylinder has 3 faces: top, bottom (planes), curved surface (cylinder)
         assert data['face'].x.shape[0] == 3
 
         # Check we have both plane and cylinder surfaces
-        face_types = data['face'].x[:, :SurfaceType.OTHER + 1].argmax(dim=1)
+        face_types = cylinder_10_5.face_types
         has_plane = (face_types == SurfaceType.PLANE).any()
         has_cylinder = (face_types == SurfaceType.CYLINDER).any()
         assert has_plane and has_cylinder
 
         # Check we have both line and circle edges
-        edge_types = data['edge'].x[:, :CurveType.OTHER + 1].argmax(dim=1)
+        edge_types = cylinder_10_5.edge_types
         has_circle = (edge_types == CurveType.CIRCLE).any()
         assert has_circle
 
-    def test_sphere(self):
+    def test_sphere(self, sphere_5):
         """Test converting a sphere."""
-        sphere = cq.Workplane("XY").sphere(5)
-        data = cadquery_to_pyg(sphere)
+        data = sphere_5.data
 
         # A sphere has 1 face
         assert data['face'].x.shape[0] == 1
 
         # The face should be a sphere surface
-        face_types = data['face'].x[:, :SurfaceType.OTHER + 1].argmax(dim=1)
+        face_types = sphere_5.face_types
         assert face_types[0] == SurfaceType.SPHERE
 
-    def test_cone(self):
+    def test_cone(self, convert, revolved_cone_shape):
         """Test converting a cone."""
-        # Create a cone using revolution
-        cone = (
-            cq.Workplane("XZ")
-            .moveTo(0, 0)
-            .lineTo(5, 0)
-            .lineTo(0, 10)
-            .close()
-            .revolve(360)
-        )
-        data = cadquery_to_pyg(cone)
+        data = convert(revolved_cone_shape).data
 
         # Check we have faces
         assert data['face'].x.shape[0] > 0
@@ -94,10 +86,9 @@ class TestBasicShapes:
 class TestComplexShapes:
     """Test conversion of more complex shapes."""
 
-    def test_fillet_box(self):
+    def test_fillet_box(self, convert, fillet_box_shape):
         """Test a box with fillets (introduces B-spline surfaces)."""
-        box = cq.Workplane("XY").box(10, 10, 10).edges().fillet(1)
-        data = cadquery_to_pyg(box)
+        data = convert(fillet_box_shape).data
 
         # Should have more faces than a simple box due to fillets
         assert data['face'].x.shape[0] > 6
@@ -106,16 +97,9 @@ class TestComplexShapes:
         # (fillets are typically represented as B-splines)
         assert data['control_point'].x.shape[0] >= 0  # May or may not have CPs depending on fillet impl
 
-    def test_loft(self):
+    def test_loft(self, convert, loft_shape):
         """Test a loft which creates B-spline surfaces."""
-        loft = (
-            cq.Workplane("XY")
-            .rect(10, 10)
-            .workplane(offset=10)
-            .circle(5)
-            .loft()
-        )
-        data = cadquery_to_pyg(loft)
+        data = convert(loft_shape).data
 
         # Should have faces
         assert data['face'].x.shape[0] > 0
@@ -127,54 +111,40 @@ class TestComplexShapes:
 class TestInputTypes:
     """Test different input types."""
 
-    def test_workplane_input(self):
+    def test_workplane_input(self, box5):
         """Test Workplane input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        data = cadquery_to_pyg(wp)
+        data = cadquery_to_pyg(box5)
         assert data['vertex'].x.shape[0] == 8
 
-    def test_shape_input(self):
+    def test_shape_input(self, box5):
         """Test Shape input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        shape = wp.val()
-        data = cadquery_to_pyg(shape)
+        data = cadquery_to_pyg(box5.val())
         assert data['vertex'].x.shape[0] == 8
 
-    def test_topodsshape_input(self):
+    def test_topodsshape_input(self, box5):
         """Test TopoDS_Shape input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        occ_shape = wp.val().wrapped
-        data = cadquery_to_pyg(occ_shape)
+        data = cadquery_to_pyg(box5.val().wrapped)
         assert data['vertex'].x.shape[0] == 8
 
 
 class TestDataIntegrity:
     """Test data integrity and consistency."""
 
-    def test_edge_indices_valid(self):
+    def test_edge_indices_valid(self, box10):
         """Test that edge indices are valid."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
-
-        # vertex-edge relationships
-        v_e_idx = data['vertex', 'bounds', 'edge'].edge_index
-        assert v_e_idx[0].max() < data['vertex'].x.shape[0]
-        assert v_e_idx[1].max() < data['edge'].x.shape[0]
-
-        # edge-face relationships
-        e_f_idx = data['edge', 'bounds', 'face'].edge_index
-        assert e_f_idx[0].max() < data['edge'].x.shape[0]
-        assert e_f_idx[1].max() < data['face'].x.shape[0]
+        data = box10.data
 
-        # face-face adjacency
-        f_f_idx = data['face', 'adjacent', 'face'].edge_index
-        assert f_f_idx[0].max() < data['face'].x.shape[0]
-        assert f_f_idx[1].max() < data['face'].x.shape[0]
+        # Largest (source, target) index of each relation vs. (source, target) node counts
+        relations = [('vertex', 'bounds', 'edge'), ('edge', 'bounds', 'face'), ('face', 'adjacent', 'face')]
+        max_indices = torch.stack([data[rel].edge_index.amax(dim=1) for rel in relations])
+        node_counts = torch.tensor([
+            [data[src].x.shape[0], data[dst].x.shape[0]] for src, _, dst in relations
+        ])
+        assert (max_indices < node_counts).all()
 
-    def test_tensor_dtypes(self):
+    def test_tensor_dtypes(self, box10):
         """Test that tensors have correct dtypes."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         # Features should be float32
         assert data['vertex'].x.dtype == torch.float32
@@ -189,53 +159,72 @@ class TestDataIntegrity:
 class TestKnotVectors:
     """Test that knot vectors are properly stored."""
 
-    def test_knots_stored(self):
+    def test_knots_stored(self, spline_extrude):
         """Test that knot vectors are stored for B-spline edges/faces."""
-        # Create a spline-based shape
-        spline = (
-            cq.Workplane("XY")
-            .spline([(0, 0), (1, 1), (2, 0), (3, 1)])
-            .close()
-            .extrude(1)
-        )
-        data = cadquery_to_pyg(spline)
+        data = spline_extrude.data
 
         # Check that knot lists exist
         assert hasattr(data['edge'], 'knots')
         assert hasattr(data['face'], 'u_knots')
         assert hasattr(data['face'], 'v_knots')
 
+    def test_knots_ragged_layout(self, spline_extrude):
+        """Test that knot vectors are stored as flat float64 values plus per-node counts."""
+        data = spline_extrude.data
+
+        counts = data['edge'].knots_counts
+        assert counts.shape[0] == data['edge'].x.shape[0]
+        assert counts.sum() == data['edge'].knots.shape[0]
+        assert data['edge'].knots.dtype == torch.float64
+        assert data['edge'].multiplicities.shape == data['edge'].knots.shape
+
+        # Only B-spline edges carry knots
+        edge_types = spline_extrude.edge_types
+        has_knots = counts > 0
+        assert has_knots.any()
+        assert (edge_types[has_knots] == CurveType.BSPLINE).all()
+
+        for side in ('u', 'v'):
+            face_counts = data['face'][f'{side}_knots_counts']
+            assert face_counts.shape[0] == data['face'].x.shape[0]
+            assert face_counts.sum() == data['face'][f'{side}_knots'].shape[0]
+            assert data['face'][f'{side}_knots'].dtype == torch.float64
+
+    def test_knots_survive_batching(self, spline_extrude, spline_arch):
+        """Test that batched knot counts still slice out each graph's knot vectors."""
+        graphs = [spline_extrude.data, spline_arch.data]
+        batch = Batch.from_data_list(graphs)
+
+        counts = batch['edge'].knots_counts
+        assert torch.equal(counts, torch.cat([g['edge'].knots_counts for g in graphs]))
+        assert counts.sum() == batch['edge'].knots.shape[0]
+
+        # The knots of the second graph's edges come right after the first graph's
+        first = graphs[0]['edge'].knots.shape[0]
+        assert torch.equal(batch['edge'].knots[first:], graphs[1]['edge'].knots)
+
 
 class TestFeatureDimensions:
     """Test that feature tensors have correct dimensions."""
 
-    def test_vertex_feature_dim(self):
+    def test_vertex_feature_dim(self, box10):
         """Test vertex feature dimensions."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
         assert data['vertex'].x.shape[1] == VERTEX_FEATURE_DIM
 
-    def test_edge_feature_dim(self):
+    def test_edge_feature_dim(self, box10):
         """Test edge feature dimensions."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
         assert data['edge'].x.shape[1] == EDGE_FEATURE_DIM
 
-    def test_face_feature_dim(self):
+    def test_face_feature_dim(self, box10):
         """Test face feature dimensions."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
         assert data['face'].x.shape[1] == FACE_FEATURE_DIM
 
-    def test_control_point_feature_dim(self):
+    def test_control_point_feature_dim(self, spline_extrude):
         """Test control point feature dimensions for B-spline shape."""
-        spline = (
-            cq.Workplane("XY")
-            .spline([(0, 0), (1, 1), (2, 0), (3, 1)])
-            .close()
-            .extrude(1)
-        )
-        data = cadquery_to_pyg(spline)
+        data = spline_extrude.data
         if data['control_point'].x.shape[0] > 0:
             assert data['control_point'].x.shape[1] == CONTROL_POINT_FEATURE_DIM
 
@@ -243,23 +232,17 @@ class TestFeatureDimensions:
 class TestMoreSurfaceTypes:
     """Test additional surface types."""
 
-    def test_torus(self):
+    def test_torus(self, convert, torus_shape):
         """Test converting a torus (surface of revolution)."""
-        # Create torus by revolving a circle
-        torus = (
-            cq.Workplane("XZ")
-            .center(10, 0)  # Move circle center away from axis
-            .circle(3)
-            .revolve(360, (0, 0, 0), (0, 0, 1))
-        )
-        data = cadquery_to_pyg(torus)
+        converted = convert(torus_shape)
+        data = converted.data
 
         # A torus has 1 face
         assert data['face'].x.shape[0] == 1
 
         # The face should be a torus or revolution surface
         # (OpenCASCADE may represent it as either depending on construction)
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = converted.face_types
         assert face_types[0] in (SurfaceType.TORUS, SurfaceType.REVOLUTION)
 
     def test_cone_surface(self):
@@ -284,25 +267,24 @@ class TestMoreSurfaceTypes:
 class TestGeometryValues:
     """Test that geometry values are correctly extracted."""
 
-    def test_box_vertex_coordinates(self):
+    def test_box_vertex_coordinates(self, box10):
         """Test that box vertices have correct coordinates."""
         size = 10
-        box = cq.Workplane("XY").box(size, size, size)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         vertices = data['vertex'].x
         # All coordinates should be within [-size/2, size/2]
         assert vertices.min() >= -size / 2 - 0.001
         assert vertices.max() <= size / 2 + 0.001
 
-    def test_sphere_radius(self):
+    def test_sphere_radius(self, convert, sphere_7_5_shape):
         """Test that sphere has correct radius in features."""
         radius = 7.5
-        sphere = cq.Workplane("XY").sphere(radius)
-        data = cadquery_to_pyg(sphere)
+        converted = convert(sphere_7_5_shape)
+        data = converted.data
 
         # Find the sphere face and check its radius
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = converted.face_types
         sphere_idx = (face_types == SurfaceType.SPHERE).nonzero()[0][0]
 
         # Radius is stored after type one-hot + orientation + degrees + closed + bounds + normal + origin + axis_dir + axis_origin
@@ -311,29 +293,26 @@ class TestGeometryValues:
         stored_radius = data['face'].x[sphere_idx, radius_idx].item()
         assert abs(stored_radius - radius) < 0.001
 
-    def test_cylinder_radius(self):
+    def test_cylinder_radius(self, cylinder_10_5):
         """Test that cylinder has correct radius in features."""
         radius = 5.0
-        height = 10.0
-        cylinder = cq.Workplane("XY").cylinder(height, radius)
-        data = cadquery_to_pyg(cylinder)
+        data = cylinder_10_5.data
 
         # Find the cylinder face
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = cylinder_10_5.face_types
         cyl_idx = (face_types == SurfaceType.CYLINDER).nonzero()[0][0]
 
         radius_idx = NUM_SURFACE_TYPES + 21
         stored_radius = data['face'].x[cyl_idx, radius_idx].item()
         assert abs(stored_radius - radius) < 0.001
 
-    def test_circle_radius(self):
+    def test_circle_radius(self, cylinder_10_5):
         """Test that circle edges have correct radius."""
         radius = 5.0
-        cylinder = cq.Workplane("XY").cylinder(10, radius)
-        data = cadquery_to_pyg(cylinder)
+        data = cylinder_10_5.data
 
         # Find circle edges
-        edge_types = data['edge'].x[:, :NUM_CURVE_TYPES].argmax(dim=1)
+        edge_types = cylinder_10_5.edge_types
         circle_mask = edge_types == CurveType.CIRCLE
 
         if circle_mask.any():
@@ -347,10 +326,9 @@ class TestGeometryValues:
 class TestTopologyConnectivity:
     """Test topology connectivity properties."""
 
-    def test_each_edge_has_vertices(self):
+    def test_each_edge_has_vertices(self, box10):
         """Test that each edge is bounded by vertices."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         v_e_idx = data['vertex', 'bounds', 'edge'].edge_index
         num_edges = data['edge'].x.shape[0]
@@ -359,61 +337,62 @@ class TestTopologyConnectivity:
         edges_with_vertices = set(v_e_idx[1].tolist())
         assert len(edges_with_vertices) == num_edges
 
-    def test_each_face_has_edges(self):
+    def test_each_face_has_edges(self, box10):
         """Test that each face has bounding edges."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         e_f_idx = data['edge', 'bounds', 'face'].edge_index
         num_faces = data['face'].x.shape[0]
 
         # Each face should have at least 3 edges
-        for face_idx in range(num_faces):
-            edges_for_face = (e_f_idx[1] == face_idx).sum()
-            assert edges_for_face >= 3, f"Face {face_idx} has only {edges_for_face} edges"
+        edges_per_face = torch.bincount(e_f_idx[1], minlength=num_faces)
+        assert (edges_per_face >= 3).all(), f"Edges per face: {edges_per_face.tolist()}"
 
-    def test_face_adjacency_symmetric(self):
+    def test_face_adjacency_symmetric(self, box10):
         """Test that face adjacency is symmetric."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         f_f_idx = data['face', 'adjacent', 'face'].edge_index
 
-        # For each (a, b) there should be (b, a)
-        edges_set = set()
-        for i in range(f_f_idx.shape[1]):
-            a, b = f_f_idx[0, i].item(), f_f_idx[1, i].item()
-            edges_set.add((a, b))
-
-        for a, b in list(edges_set):
-            assert (b, a) in edges_set, f"Missing reverse edge ({b}, {a})"
+        # For each (a, b) there should be (b, a): the sorted pair keys a * F + b
+        # must equal the sorted keys of the reversed pairs
+        num_faces = data['face'].x.shape[0]
+        forward = torch.sort(f_f_idx[0] * num_faces + f_f_idx[1]).values
+        reverse = torch.sort(f_f_idx[1] * num_faces + f_f_idx[0]).values
+        assert torch.equal(forward, reverse)
 
-    def test_box_face_adjacency_count(self):
+    def test_box_face_adjacency_count(self, box10):
         """Test that box has correct face adjacency (each face adjacent to 4 others)."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         f_f_idx = data['face', 'adjacent', 'face'].edge_index
         num_faces = data['face'].x.shape[0]
 
         # Each face of a box should be adjacent to 4 other faces
-        for face_idx in range(num_faces):
-            adjacent_count = (f_f_idx[0] == face_idx).sum()
-            assert adjacent_count == 4, f"Face {face_idx} has {adjacent_count} adjacent faces"
+        adjacent_counts = torch.bincount(f_f_idx[0], minlength=num_faces)
+        assert (adjacent_counts == 4).all(), f"Adjacent faces per face: {adjacent_counts.tolist()}"
+
+    def test_skipped_relationships_are_empty(self, box10_shape):
+        """Test that extract_topology leaves disabled relationships empty."""
+        shape = box10_shape.val().wrapped
+        topo = extract_topology(shape, vertex_edge=False, edge_face=False)
+
+        assert len(topo.edges) == 12
+        assert topo.vertex_to_edge.shape == (2, 0)
+        assert topo.edge_to_face.shape == (2, 0)
+        assert topo.face_to_face.shape == (2, 12)
+
+        topo = extract_topology(shape, face_adjacency=False)
+        assert topo.edge_to_face.shape == (2, 24)
+        assert topo.face_to_face.shape == (2, 0)
 
 
 class TestControlPoints:
     """Test control point extraction for B-splines."""
 
-    def test_bspline_curve_has_control_points(self):
+    def test_bspline_curve_has_control_points(self, spline_arch):
         """Test that B-spline curves have control points."""
-        spline = (
-            cq.Workplane("XY")
-            .spline([(0, 0), (1, 2), (3, 2), (4, 0)])
-            .close()
-            .extrude(1)
-        )
-        data = cadquery_to_pyg(spline)
+        data = spline_arch.data
 
         # Should have control points
         assert data['control_point'].x.shape[0] > 0
@@ -425,15 +404,9 @@ class TestControlPoints:
         weights = data['control_point'].x[:, 3]
         assert (weights > 0).all()
 
-    def test_control_point_edge_relationship(self):
+    def test_control_point_edge_relationship(self, spline_arch):
         """Test control point to edge relationships."""
-        spline = (
-            cq.Workplane("XY")
-            .spline([(0, 0), (1, 2), (3, 2), (4, 0)])
-            .close()
-            .extrude(1)
-        )
-        data = cadquery_to_pyg(spline)
+        data = spline_arch.data
 
         cp_e_idx = data['control_point', 'controls', 'edge'].edge_index
 
@@ -443,15 +416,9 @@ class TestControlPoints:
             # Edge indices should be valid
             assert cp_e_idx[1].max() < data['edge'].x.shape[0]
 
-    def test_control_point_sequence_attr(self):
+    def test_control_point_sequence_attr(self, spline_arch):
         """Test that control point sequence indices are stored."""
-        spline = (
-            cq.Workplane("XY")
-            .spline([(0, 0), (1, 2), (3, 2), (4, 0)])
-            .close()
-            .extrude(1)
-        )
-        data = cadquery_to_pyg(spline)
+        data = spline_arch.data
 
         cp_e_attr = data['control_point', 'controls', 'edge'].edge_attr
 
@@ -463,26 +430,22 @@ class TestControlPoints:
 class TestBooleanOperations:
     """Test shapes created with boolean operations."""
 
-    def test_union(self):
+    def test_union(self, convert, union_shape):
         """Test union of two boxes."""
-        box1 = cq.Workplane("XY").box(10, 10, 10)
-        box2 = cq.Workplane("XY").center(5, 0).box(10, 10, 10)
-        union = box1.union(box2)
-        data = cadquery_to_pyg(union)
+        data = convert(union_shape).data
 
         # Union of overlapping boxes should have more faces
         assert data['face'].x.shape[0] >= 6
         assert data['vertex'].x.shape[0] > 0
         assert data['edge'].x.shape[0] > 0
 
-    def test_difference(self):
+    def test_difference(self, convert, difference_shape):
         """Test difference (hole in box)."""
-        box = cq.Workplane("XY").box(20, 20, 20)
-        hole = box.faces(">Z").workplane().hole(5)
-        data = cadquery_to_pyg(hole)
+        converted = convert(difference_shape)
+        data = converted.data
 
         # Should have cylinder surface from the hole
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = converted.face_types
         has_cylinder = (face_types == SurfaceType.CYLINDER).any()
         assert has_cylinder
 
@@ -500,22 +463,18 @@ class TestBooleanOperations:
 class TestCompoundShapes:
     """Test compound/assembly shapes."""
 
-    def test_multiple_solids(self):
+    def test_multiple_solids(self, convert, compound_shape):
         """Test shape with multiple disconnected solids."""
-        box1 = cq.Workplane("XY").box(5, 5, 5).val()
-        box2 = cq.Workplane("XY").center(20, 0).box(5, 5, 5).val()
-        compound = cq.Compound.makeCompound([box1, box2])
-        data = cadquery_to_pyg(compound)
+        data = convert(compound_shape).data
 
         # Should have 16 vertices (8 per box)
         assert data['vertex'].x.shape[0] == 16
         # Should have 12 faces (6 per box)
         assert data['face'].x.shape[0] == 12
 
-    def test_shell(self):
+    def test_shell(self, convert, shell_shape):
         """Test a shell (hollow box)."""
-        shell = cq.Workplane("XY").box(10, 10, 10).shell(-1)
-        data = cadquery_to_pyg(shell)
+        data = convert(shell_shape).data
 
         # Shell has both inner and outer faces
         assert data['face'].x.shape[0] > 6
@@ -524,20 +483,18 @@ class TestCompoundShapes:
 class TestOrientation:
     """Test face and edge orientation."""
 
-    def test_face_orientation_stored(self):
+    def test_face_orientation_stored(self, box10):
         """Test that face orientation is stored in features."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         # Orientation is at position NUM_SURFACE_TYPES
         orientations = data['face'].x[:, NUM_SURFACE_TYPES]
         # All orientations should be +1 or -1
         assert ((orientations == 1) | (orientations == -1)).all()
 
-    def test_edge_orientation_stored(self):
+    def test_edge_orientation_stored(self, box10):
         """Test that edge orientation is stored in features."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         # Orientation is at position NUM_CURVE_TYPES
         orientations = data['edge'].x[:, NUM_CURVE_TYPES]
@@ -554,20 +511,18 @@ class TestEdgeCases:
         data = cadquery_to_pyg(face)
         assert data['face'].x.shape[0] >= 1
 
-    def test_wedge(self):
+    def test_wedge(self, convert, wedge_shape):
         """Test a wedge shape."""
-        wedge = cq.Workplane("XY").polygon(3, 10).extrude(10)
-        data = cadquery_to_pyg(wedge)
+        data = convert(wedge_shape).data
 
         # Triangle prism: 5 faces (2 triangles + 3 rectangles)
         assert data['face'].x.shape[0] == 5
         # 6 vertices
         assert data['vertex'].x.shape[0] == 6
 
-    def test_chamfer(self):
+    def test_chamfer(self, convert, chamfer_box_shape):
         """Test shape with chamfers."""
-        box = cq.Workplane("XY").box(10, 10, 10).edges().chamfer(1)
-        data = cadquery_to_pyg(box)
+        data = convert(chamfer_box_shape).data
 
         # Chamfers add extra faces
         assert data['face'].x.shape[0] > 6
@@ -576,13 +531,12 @@ class TestEdgeCases:
 class TestPlaneNormals:
     """Test plane normal vectors."""
 
-    def test_box_plane_normals(self):
+    def test_box_plane_normals(self, box10):
         """Test that box planes have correct normal directions."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg(box)
+        data = box10.data
 
         # Find plane faces
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = box10.face_types
         plane_mask = face_types == SurfaceType.PLANE
 
         # Normal starts at NUM_SURFACE_TYPES + 1 + 2 + 2 + 4 = NUM_SURFACE_TYPES + 9
@@ -600,10 +554,9 @@ class TestPlaneNormals:
 class TestSimpleConverter:
     """Test the simple converter (no B-spline data)."""
 
-    def test_simple_box(self):
+    def test_simple_box(self, box10_simple):
         """Test simple converter on a box."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         # A box has 8 vertices, 12 edges, 6 faces
         assert data['vertex'].x.shape[0] == 8
@@ -615,47 +568,42 @@ class TestSimpleConverter:
         assert data['edge', 'bounds', 'face'].edge_index.shape[1] > 0
         assert data['face', 'adjacent', 'face'].edge_index.shape[1] > 0
 
-    def test_simple_cylinder(self):
+    def test_simple_cylinder(self, cylinder_10_5_simple):
         """Test simple converter on a cylinder."""
-        cylinder = cq.Workplane("XY").cylinder(10, 5)
-        data = cadquery_to_pyg_simple(cylinder)
+        data = cylinder_10_5_simple.data
 
         # Check we have both plane and cylinder surfaces
-        face_types = data['face'].x[:, :SurfaceType.OTHER + 1].argmax(dim=1)
+        face_types = cylinder_10_5_simple.face_types
         has_plane = (face_types == SurfaceType.PLANE).any()
         has_cylinder = (face_types == SurfaceType.CYLINDER).any()
         assert has_plane and has_cylinder
 
-    def test_simple_sphere(self):
+    def test_simple_sphere(self, sphere_5_simple):
         """Test simple converter on a sphere."""
-        sphere = cq.Workplane("XY").sphere(5)
-        data = cadquery_to_pyg_simple(sphere)
+        data = sphere_5_simple.data
 
         assert data['face'].x.shape[0] == 1
-        face_types = data['face'].x[:, :SurfaceType.OTHER + 1].argmax(dim=1)
+        face_types = sphere_5_simple.face_types
         assert face_types[0] == SurfaceType.SPHERE
 
-    def test_simple_no_control_points(self):
+    def test_simple_no_control_points(self, box10_simple):
         """Test that simple converter has no control_point node type."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         # Should not have control_point in node types
         assert 'control_point' not in data.node_types
 
-    def test_simple_no_knots(self):
+    def test_simple_no_knots(self, box10_simple):
         """Test that simple converter has no knots on edges."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         # Should not have knots attribute
         assert not hasattr(data['edge'], 'knots')
         assert not hasattr(data['edge'], 'multiplicities')
 
-    def test_simple_no_face_knots(self):
+    def test_simple_no_face_knots(self, box10_simple):
         """Test that simple converter has no knots on faces."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         # Should not have u_knots, v_knots attributes
         assert not hasattr(data['face'], 'u_knots')
@@ -663,10 +611,9 @@ class TestSimpleConverter:
         assert not hasattr(data['face'], 'u_multiplicities')
         assert not hasattr(data['face'], 'v_multiplicities')
 
-    def test_simple_fillet_box(self):
+    def test_simple_fillet_box(self, convert, fillet_box_shape):
         """Test simple converter on a filleted box (has B-splines, but we ignore them)."""
-        box = cq.Workplane("XY").box(10, 10, 10).edges().fillet(1)
-        data = cadquery_to_pyg_simple(box)
+        data = convert(fillet_box_shape, simple=True).data
 
         # Should have more faces than a simple box due to fillets
         assert data['face'].x.shape[0] > 6
@@ -674,16 +621,9 @@ class TestSimpleConverter:
         # But no control points
         assert 'control_point' not in data.node_types
 
-    def test_simple_loft(self):
+    def test_simple_loft(self, convert, loft_shape):
         """Test simple converter on a loft (has B-splines, but we ignore them)."""
-        loft = (
-            cq.Workplane("XY")
-            .rect(10, 10)
-            .workplane(offset=10)
-            .circle(5)
-            .loft()
-        )
-        data = cadquery_to_pyg_simple(loft)
+        data = convert(loft_shape, simple=True).data
 
         # Should have faces
         assert data['face'].x.shape[0] > 0
@@ -692,50 +632,36 @@ class TestSimpleConverter:
         assert 'control_point' not in data.node_types
         assert not hasattr(data['edge'], 'knots')
 
-    def test_simple_workplane_input(self):
+    def test_simple_workplane_input(self, box5):
         """Test simple converter with Workplane input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        data = cadquery_to_pyg_simple(wp)
+        data = cadquery_to_pyg_simple(box5)
         assert data['vertex'].x.shape[0] == 8
 
-    def test_simple_shape_input(self):
+    def test_simple_shape_input(self, box5):
         """Test simple converter with Shape input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        shape = wp.val()
-        data = cadquery_to_pyg_simple(shape)
+        data = cadquery_to_pyg_simple(box5.val())
         assert data['vertex'].x.shape[0] == 8
 
-    def test_simple_topodsshape_input(self):
+    def test_simple_topodsshape_input(self, box5):
         """Test simple converter with TopoDS_Shape input."""
-        wp = cq.Workplane("XY").box(5, 5, 5)
-        occ_shape = wp.val().wrapped
-        data = cadquery_to_pyg_simple(occ_shape)
+        data = cadquery_to_pyg_simple(box5.val().wrapped)
         assert data['vertex'].x.shape[0] == 8
 
-    def test_simple_edge_indices_valid(self):
+    def test_simple_edge_indices_valid(self, box10_simple):
         """Test that edge indices are valid in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
-        # vertex-edge relationships
-        v_e_idx = data['vertex', 'bounds', 'edge'].edge_index
-        assert v_e_idx[0].max() < data['vertex'].x.shape[0]
-        assert v_e_idx[1].max() < data['edge'].x.shape[0]
-
-        # edge-face relationships
-        e_f_idx = data['edge', 'bounds', 'face'].edge_index
-        assert e_f_idx[0].max() < data['edge'].x.shape[0]
-        assert e_f_idx[1].max() < data['face'].x.shape[0]
-
-        # face-face adjacency
-        f_f_idx = data['face', 'adjacent', 'face'].edge_index
-        assert f_f_idx[0].max() < data['face'].x.shape[0]
-        assert f_f_idx[1].max() < data['face'].x.shape[0]
+        # Largest (source, target) index of each relation vs. (source, target) node counts
+        relations = [('vertex', 'bounds', 'edge'), ('edge', 'bounds', 'face'), ('face', 'adjacent', 'face')]
+        max_indices = torch.stack([data[rel].edge_index.amax(dim=1) for rel in relations])
+        node_counts = torch.tensor([
+            [data[src].x.shape[0], data[dst].x.shape[0]] for src, _, dst in relations
+        ])
+        assert (max_indices < node_counts).all()
 
-    def test_simple_tensor_dtypes(self):
+    def test_simple_tensor_dtypes(self, box10_simple):
         """Test that tensors have correct dtypes in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         # Features should be float32
         assert data['vertex'].x.dtype == torch.float32
@@ -746,10 +672,9 @@ class TestSimpleConverter:
         assert data['vertex', 'bounds', 'edge'].edge_index.dtype == torch.long
         assert data['edge', 'bounds', 'face'].edge_index.dtype == torch.long
 
-    def test_simple_each_edge_has_vertices(self):
+    def test_simple_each_edge_has_vertices(self, box10_simple):
         """Test that each edge has vertices in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         v_e_idx = data['vertex', 'bounds', 'edge'].edge_index
         num_edges = data['edge'].x.shape[0]
@@ -757,185 +682,148 @@ class TestSimpleConverter:
         edges_with_vertices = set(v_e_idx[1].tolist())
         assert len(edges_with_vertices) == num_edges
 
-    def test_simple_each_face_has_edges(self):
+    def test_simple_each_face_has_edges(self, box10_simple):
         """Test that each face has edges in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         e_f_idx = data['edge', 'bounds', 'face'].edge_index
         num_faces = data['face'].x.shape[0]
 
-        for face_idx in range(num_faces):
-            edges_for_face = (e_f_idx[1] == face_idx).sum()
-            assert edges_for_face >= 3, f"Face {face_idx} has only {edges_for_face} edges"
+        edges_per_face = torch.bincount(e_f_idx[1], minlength=num_faces)
+        assert (edges_per_face >= 3).all(), f"Edges per face: {edges_per_face.tolist()}"
 
-    def test_simple_face_adjacency_symmetric(self):
+    def test_simple_face_adjacency_symmetric(self, box10_simple):
         """Test that face adjacency is symmetric in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         f_f_idx = data['face', 'adjacent', 'face'].edge_index
 
-        edges_set = set()
-        for i in range(f_f_idx.shape[1]):
-            a, b = f_f_idx[0, i].item(), f_f_idx[1, i].item()
-            edges_set.add((a, b))
-
-        for a, b in list(edges_set):
-            assert (b, a) in edges_set, f"Missing reverse edge ({b}, {a})"
+        num_faces = data['face'].x.shape[0]
+        forward = torch.sort(f_f_idx[0] * num_faces + f_f_idx[1]).values
+        reverse = torch.sort(f_f_idx[1] * num_faces + f_f_idx[0]).values
+        assert torch.equal(forward, reverse)
 
-    def test_simple_cone(self):
+    def test_simple_cone(self, convert, revolved_cone_shape):
         """Test simple converter on a cone."""
-        cone = (
-            cq.Workplane("XZ")
-            .moveTo(0, 0)
-            .lineTo(5, 0)
-            .lineTo(0, 10)
-            .close()
-            .revolve(360)
-        )
-        data = cadquery_to_pyg_simple(cone)
+        data = convert(revolved_cone_shape, simple=True).data
         assert data['face'].x.shape[0] > 0
         assert 'control_point' not in data.node_types
 
-    def test_simple_torus(self):
+    def test_simple_torus(self, convert, torus_shape):
         """Test simple converter on a torus."""
-        torus = (
-            cq.Workplane("XZ")
-            .center(10, 0)
-            .circle(3)
-            .revolve(360, (0, 0, 0), (0, 0, 1))
-        )
-        data = cadquery_to_pyg_simple(torus)
+        data = convert(torus_shape, simple=True).data
         assert data['face'].x.shape[0] == 1
         assert 'control_point' not in data.node_types
 
-    def test_simple_union(self):
+    def test_simple_union(self, convert, union_shape):
         """Test simple converter on union of boxes."""
-        box1 = cq.Workplane("XY").box(10, 10, 10)
-        box2 = cq.Workplane("XY").center(5, 0).box(10, 10, 10)
-        union = box1.union(box2)
-        data = cadquery_to_pyg_simple(union)
+        data = convert(union_shape, simple=True).data
 
         assert data['face'].x.shape[0] >= 6
         assert data['vertex'].x.shape[0] > 0
         assert 'control_point' not in data.node_types
 
-    def test_simple_difference(self):
+    def test_simple_difference(self, convert, difference_shape):
         """Test simple converter on difference (hole in box)."""
-        box = cq.Workplane("XY").box(20, 20, 20)
-        hole = box.faces(">Z").workplane().hole(5)
-        data = cadquery_to_pyg_simple(hole)
+        converted = convert(difference_shape, simple=True)
+        data = converted.data
 
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = converted.face_types
         has_cylinder = (face_types == SurfaceType.CYLINDER).any()
         assert has_cylinder
         assert 'control_point' not in data.node_types
 
-    def test_simple_chamfer(self):
+    def test_simple_chamfer(self, convert, chamfer_box_shape):
         """Test simple converter on chamfered box."""
-        box = cq.Workplane("XY").box(10, 10, 10).edges().chamfer(1)
-        data = cadquery_to_pyg_simple(box)
+        data = convert(chamfer_box_shape, simple=True).data
 
         assert data['face'].x.shape[0] > 6
         assert 'control_point' not in data.node_types
 
-    def test_simple_compound(self):
+    def test_simple_compound(self, convert, compound_shape):
         """Test simple converter on compound shape."""
-        box1 = cq.Workplane("XY").box(5, 5, 5).val()
-        box2 = cq.Workplane("XY").center(20, 0).box(5, 5, 5).val()
-        compound = cq.Compound.makeCompound([box1, box2])
-        data = cadquery_to_pyg_simple(compound)
+        data = convert(compound_shape, simple=True).data
 
         assert data['vertex'].x.shape[0] == 16
         assert data['face'].x.shape[0] == 12
         assert 'control_point' not in data.node_types
 
-    def test_simple_shell(self):
+    def test_simple_shell(self, convert, shell_shape):
         """Test simple converter on shell (hollow box)."""
-        shell = cq.Workplane("XY").box(10, 10, 10).shell(-1)
-        data = cadquery_to_pyg_simple(shell)
+        data = convert(shell_shape, simple=True).data
 
         assert data['face'].x.shape[0] > 6
         assert 'control_point' not in data.node_types
 
-    def test_simple_wedge(self):
+    def test_simple_wedge(self, convert, wedge_shape):
         """Test simple converter on wedge shape."""
-        wedge = cq.Workplane("XY").polygon(3, 10).extrude(10)
-        data = cadquery_to_pyg_simple(wedge)
+        data = convert(wedge_shape, simple=True).data
 
         assert data['face'].x.shape[0] == 5
         assert data['vertex'].x.shape[0] == 6
         assert 'control_point' not in data.node_types
 
-    def test_simple_feature_dimensions(self):
+    def test_simple_feature_dimensions(self, box10_simple):
         """Test that feature dimensions are correct in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         assert data['vertex'].x.shape[1] == VERTEX_FEATURE_DIM
         assert data['edge'].x.shape[1] == EDGE_FEATURE_DIM
         assert data['face'].x.shape[1] == FACE_FEATURE_DIM
 
-    def test_simple_box_vertex_coordinates(self):
+    def test_simple_box_vertex_coordinates(self, box10_simple):
         """Test that box vertices have correct coordinates in simple output."""
         size = 10
-        box = cq.Workplane("XY").box(size, size, size)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         vertices = data['vertex'].x
         assert vertices.min() >= -size / 2 - 0.001
         assert vertices.max() <= size / 2 + 0.001
 
-    def test_simple_cylinder_radius(self):
+    def test_simple_cylinder_radius(self, cylinder_10_5_simple):
         """Test that cylinder has correct radius in simple output."""
         radius = 5.0
-        height = 10.0
-        cylinder = cq.Workplane("XY").cylinder(height, radius)
-        data = cadquery_to_pyg_simple(cylinder)
+        data = cylinder_10_5_simple.data
 
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = cylinder_10_5_simple.face_types
         cyl_idx = (face_types == SurfaceType.CYLINDER).nonzero()[0][0]
 
         radius_idx = NUM_SURFACE_TYPES + 21
         stored_radius = data['face'].x[cyl_idx, radius_idx].item()
         assert abs(stored_radius - radius) < 0.001
 
-    def test_simple_sphere_radius(self):
+    def test_simple_sphere_radius(self, convert, sphere_7_5_shape):
         """Test that sphere has correct radius in simple output."""
         radius = 7.5
-        sphere = cq.Workplane("XY").sphere(radius)
-        data = cadquery_to_pyg_simple(sphere)
+        converted = convert(sphere_7_5_shape, simple=True)
+        data = converted.data
 
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = converted.face_types
         sphere_idx = (face_types == SurfaceType.SPHERE).nonzero()[0][0]
 
         radius_idx = NUM_SURFACE_TYPES + 21
         stored_radius = data['face'].x[sphere_idx, radius_idx].item()
         assert abs(stored_radius - radius) < 0.001
 
-    def test_simple_face_orientation(self):
+    def test_simple_face_orientation(self, box10_simple):
         """Test that face orientation is stored in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         orientations = data['face'].x[:, NUM_SURFACE_TYPES]
         assert ((orientations == 1) | (orientations == -1)).all()
 
-    def test_simple_edge_orientation(self):
+    def test_simple_edge_orientation(self, box10_simple):
         """Test that edge orientation is stored in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         orientations = data['edge'].x[:, NUM_CURVE_TYPES]
         assert ((orientations == 1) | (orientations == -1)).all()
 
-    def test_simple_plane_normals(self):
+    def test_simple_plane_normals(self, box10_simple):
         """Test that plane normals are unit vectors in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
-        face_types = data['face'].x[:, :NUM_SURFACE_TYPES].argmax(dim=1)
+        face_types = box10_simple.face_types
         plane_mask = face_types == SurfaceType.PLANE
 
         normal_start = NUM_SURFACE_TYPES + 9
@@ -947,13 +835,12 @@ class TestSimpleConverter:
             if length > 0.001:
                 assert abs(length - 1.0) < 0.01, f"Normal {i} has length {length}"
 
-    def test_simple_circle_radius(self):
+    def test_simple_circle_radius(self, cylinder_10_5_simple):
         """Test that circle edges have correct radius in simple output."""
         radius = 5.0
-        cylinder = cq.Workplane("XY").cylinder(10, radius)
-        data = cadquery_to_pyg_simple(cylinder)
+        data = cylinder_10_5_simple.data
 
-        edge_types = data['edge'].x[:, :NUM_CURVE_TYPES].argmax(dim=1)
+        edge_types = cylinder_10_5_simple.edge_types
         circle_mask = edge_types == CurveType.CIRCLE
 
         if circle_mask.any():
@@ -961,17 +848,168 @@ class TestSimpleConverter:
             circle_radii = data['edge'].x[circle_mask, radius_idx]
             assert torch.allclose(circle_radii, torch.tensor(radius), atol=0.001)
 
-    def test_simple_box_face_adjacency_count(self):
+    def test_simple_box_face_adjacency_count(self, box10_simple):
         """Test that box has correct face adjacency count in simple output."""
-        box = cq.Workplane("XY").box(10, 10, 10)
-        data = cadquery_to_pyg_simple(box)
+        data = box10_simple.data
 
         f_f_idx = data['face', 'adjacent', 'face'].edge_index
         num_faces = data['face'].x.shape[0]
 
-        for face_idx in range(num_faces):
-            adjacent_count = (f_f_idx[0] == face_idx).sum()
-            assert adjacent_count == 4, f"Face {face_idx} has {adjacent_count} adjacent faces"
+        adjacent_counts = torch.bincount(f_f_idx[0], minlength=num_faces)
+        assert (adjacent_counts == 4).all(), f"Adjacent faces per face: {adjacent_counts.tolist()}"
+
+
+class TestParallelExtraction:
+    """Test geometry extraction across worker processes."""
+
+    def test_parallel_matches_serial(self, monkeypatch, convert, loft_shape):
+        """Test that multi-process extraction produces the same graph as in-process."""
+        import cq2pyg.geometry
+        monkeypatch.setattr(cq2pyg.geometry, 'PARALLEL_MIN_ENTITIES', 0)
+
+        serial = convert(loft_shape).data
+        parallel = cadquery_to_pyg(loft_shape, processes=2)
+
+        assert parallel['control_point'].x.shape[0] > 0
+        for node_type in ('vertex', 'edge', 'face', 'control_point'):
+            assert torch.equal(serial[node_type].x, parallel[node_type].x)
+        for edge_type in serial.edge_types:
+            assert torch.equal(serial[edge_type].edge_index, parallel[edge_type].edge_index)
+
+
+class TestNumbaPacking:
+    """Test the optional numba feature-packing kernel."""
+
+    def test_numba_matches_numpy(self, monkeypatch, convert, difference_shape):
+        """Test that the compiled packer produces the same features as the NumPy one."""
+        pytest.importorskip("numba")
+        import cq2pyg.features
+
+        reference = convert(difference_shape).data
+
+        monkeypatch.setattr(cq2pyg.features, 'NUMBA_MIN_ROWS', 0)
+        data = cadquery_to_pyg(difference_shape)
+
+        assert torch.equal(reference['edge'].x, data['edge'].x)
+        assert torch.equal(reference['face'].x, data['face'].x)
+
+
+class TestPinnedMemory:
+    """Test page-locked output tensors."""
+
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason="pinned memory requires CUDA")
+    def test_pin_memory(self, box10_shape):
+        """Test that pin_memory=True pins every feature and index tensor."""
+        data = cadquery_to_pyg(box10_shape, pin_memory=True)
+
+        for node_type in data.node_types:
+            assert data[node_type].x.is_pinned()
+        for edge_type in data.edge_types:
+            assert data[edge_type].edge_index.is_pinned()
+
+
+class TestConversionCache:
+    """Test memoized conversions."""
+
+    def test_cache_hit_returns_copy(self, box10_shape):
+        """Test that a repeated conversion reuses the cached tensors in a fresh graph."""
+        shape = box10_shape.val()
+        clear_conversion_cache()
+        first = cadquery_to_pyg(shape, cache=True)
+        first['edge'].x = None
+        second = cadquery_to_pyg(shape, cache=True)
+        clear_conversion_cache()
+
+        assert second is not first
+        assert second['edge'].x.shape == (12, EDGE_FEATURE_DIM)
+        assert second['face'].x.data_ptr() == first['face'].x.data_ptr()
+
+    def test_cache_distinguishes_orientation(self, box10_shape):
+        """Test that a reversed shape is not served from the cache of the original."""
+        shape = box10_shape.val().wrapped
+        clear_conversion_cache()
+        forward = cadquery_to_pyg_simple(shape, cache=True)
+        reversed_ = cadquery_to_pyg_simple(shape.Reversed(), cache=True)
+        clear_conversion_cache()
+
+        assert reversed_['face'].x.data_ptr() != forward['face'].x.data_ptr()
+
+    def test_topology_cache(self, box10_shape):
+        """Test that cached topology is shared per shape and orientation, and cleared."""
+        shape = box10_shape.val().wrapped
+        clear_conversion_cache()
+        first = extract_topology(shape, cache=True)
+        assert extract_topology(shape, cache=True) is first
+        assert extract_topology(shape.Reversed(), cache=True) is not first
+        clear_conversion_cache()
+
+        assert extract_topology(shape, cache=True) is not first
+        clear_conversion_cache()
+
+
+class TestIndexDtype:
+    """Test configurable edge_index dtype."""
+
+    def test_int32_indices(self):
+        """Test that index_dtype=torch.int32 gives int32 indices with the same values."""
+        shape = cq.Workplane("XY").box(10, 10, 10).edges("|Z").fillet(1)
+        reference = cadquery_to_pyg(shape)
+        data = cadquery_to_pyg(shape, index_dtype=torch.int32)
+
+        for edge_type in data.edge_types:
+            assert data[edge_type].edge_index.dtype == torch.int32
+            assert torch.equal(data[edge_type].edge_index.long(), reference[edge_type].edge_index)
+
+    def test_invalid_index_dtype(self, box10_shape):
+        """Test that unsupported index dtypes are rejected."""
+        with pytest.raises(ValueError):
+            cadquery_to_pyg_simple(box10_shape, index_dtype=torch.float32)
+
+
+class TestEdgeIndex:
+    """Test edge_index construction from (source, target) pairs."""
+
+    def test_pair_array_matches_pair_list(self):
+        """Test that an [N, 2] pair array gives the same edge_index as the pair list."""
+        pairs = [(0, 1), (1, 2), (2, 3)]
+        expected = torch.tensor([[0, 1, 2], [1, 2, 3]])
+
+        assert torch.equal(build_edge_index(pairs), expected)
+        assert torch.equal(build_edge_index(np.array(pairs)), expected)
+        from_array, from_list = build_edge_indices([np.array(pairs), pairs])
+        assert torch.equal(from_array, expected)
+        assert torch.equal(from_list, expected)
+
+    def test_invalid_pair_shape(self):
+        """Test that arrays not shaped [N, 2] are rejected."""
+        with pytest.raises(ValueError):
+            build_edge_index(np.array([[0, 1, 2], [1, 2, 3]]))
+
+
+class TestFeatureDtype:
+    """Test reduced-precision node features."""
+
+    @pytest.mark.parametrize("dtype", [torch.float16, torch.bfloat16])
+    def test_half_precision_features(self, dtype, convert, difference_shape):
+        """Test that node features are cast and categorical columns stay exact."""
+        reference = convert(difference_shape).data
+        data = cadquery_to_pyg(difference_shape, feature_dtype=dtype)
+
+        for node_type in data.node_types:
+            assert data[node_type].x.dtype == dtype
+        assert torch.equal(
+            data['edge'].x[:, :NUM_CURVE_TYPES + 3].float(),
+            reference['edge'].x[:, :NUM_CURVE_TYPES + 3],
+        )
+        assert torch.equal(
+            data['face'].x[:, :NUM_SURFACE_TYPES + 5].float(),
+            reference['face'].x[:, :NUM_SURFACE_TYPES + 5],
+        )
+
+    def test_invalid_feature_dtype(self, box10_shape):
+        """Test that non-floating feature dtypes are rejected."""
+        with pytest.raises(ValueError):
+            cadquery_to_pyg_simple(box10_shape, feature_dtype=torch.int8)
 
 
 if __name__ == "__main__":